@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from .ParseTree import ParseTree
+
+
+class Backpointer:
+    # cum a fost derivat un neterminal intr-o celula: X -> left right, cu partea stanga
+    # de lungime split; e tot ce retine tabelul, arborii se construiesc doar la cerere
+    __slots__ = ('split', 'left', 'right')
+
+    def __init__(self, split: int, left: int, right: int) -> None:
+        self.split = split
+        self.left = left
+        self.right = right
+
+
+class CYKChart:
+    # tabelul CYK completat: cells[j][i] e masca neterminalilor care genereaza subcuvantul
+    # de lungime j de la pozitia i, back[j][i] le asociaza cate un Backpointer
+    def __init__(self, names: list[str], cells: list[list[int]], back: list[list[dict[int, Backpointer]]],
+                 types: list[str], lexeme: Callable[[int], str]) -> None:
+        self.names = names
+        self.number = {name: i for i, name in enumerate(names)}
+        self.cells = cells
+        self.back = back
+        self.types = types
+        self.lexeme = lexeme
+
+    def accepts(self, symbol: str, start: int = 0, length: int | None = None) -> bool:
+        #daca symbol genereaza subcuvantul de lungime length (implicit tot restul) de la start
+        if length is None:
+            length = len(self.types) - start
+        x = self.number.get(symbol)
+        if x is None or length < 1 or start < 0 or start + length > len(self.types):
+            return False
+        return bool(self.cells[length][start] >> x & 1)
+
+    def tree(self, symbol: str, start: int = 0, length: int | None = None) -> ParseTree | None:
+        #arborele de parsare pentru o celula, construit acum, fara recursivitate
+        if length is None:
+            length = len(self.types) - start
+        if not self.accepts(symbol, start, length):
+            return None
+        names, types, lexeme, back = self.names, self.types, self.lexeme, self.back
+        if length == 1:
+            return ParseTree(symbol, (types[start], lexeme(start)))
+        root = ParseTree(symbol)
+        stack = [(root, length, start, self.number[symbol])]
+        while stack:
+            tree, j, i, x = stack.pop()
+            pointer = back[j][i][x]
+            k = pointer.split
+            for child_length, child_start, child in ((k, i, pointer.left), (j - k, i + k, pointer.right)):
+                if child_length == 1:
+                    tree.add_children(ParseTree(names[child], (types[child_start], lexeme(child_start))))
+                else:
+                    subtree = ParseTree(names[child])
+                    tree.add_children(subtree)
+                    stack.append((subtree, child_length, child_start, child))
+        return root
@@ -0,0 +1,181 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable
+
+MAX_CODEPOINT = 0x10FFFF
+
+
+@dataclass(frozen=True)
+class CharSet:
+    # multime de caractere, reprezentata prin intervale [lo, hi] de coduri
+    # disjuncte si sortate (forma normala, deci egalitatea e structurala)
+    ranges: tuple[tuple[int, int], ...]
+
+    @classmethod
+    def from_ranges(cls, ranges: Iterable[tuple[int, int]]) -> 'CharSet':
+        #sortam intervalele si le unim pe cele care se ating
+        merged: list[list[int]] = []
+        for lo, hi in sorted(ranges):
+            if merged and lo <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        return cls(tuple((lo, hi) for lo, hi in merged))
+
+    @classmethod
+    def of(cls, symbol: 'str | CharSet') -> 'CharSet':
+        #un simbol simplu de pe o tranzitie devine un interval de un caracter
+        if isinstance(symbol, CharSet):
+            return symbol
+        return cls(((ord(symbol), ord(symbol)),))
+
+    def negate(self) -> 'CharSet':
+        #complementul fata de tot spatiul unicode
+        ranges = []
+        start = 0
+        for lo, hi in self.ranges:
+            if lo > start:
+                ranges.append((start, lo - 1))
+            start = hi + 1
+        if start <= MAX_CODEPOINT:
+            ranges.append((start, MAX_CODEPOINT))
+        return CharSet(tuple(ranges))
+
+    def __contains__(self, char: str) -> bool:
+        code = ord(char)
+        for lo, hi in self.ranges:
+            if lo <= code <= hi:
+                return True
+        return False
+
+    def __repr__(self) -> str:
+        parts = []
+        for lo, hi in self.ranges:
+            if lo == hi:
+                parts.append(repr(chr(lo))[1:-1])
+            else:
+                parts.append(f"{repr(chr(lo))[1:-1]}-{repr(chr(hi))[1:-1]}")
+        return f"CharSet[{''.join(parts)}]"
+
+
+class _ClassMap(dict):
+    # cache caracter -> clasa, completat la prima aparitie a caracterului
+    def __init__(self, alphabet: 'Alphabet'):
+        super().__init__()
+        self.alphabet = alphabet
+
+    def __missing__(self, char: str) -> int:
+        cls = self.alphabet.classify(char)
+        self[char] = cls
+        return cls
+
+
+class Alphabet:
+    # partitia alfabetului in clase de echivalenta: doua caractere sunt in
+    # aceeasi clasa daca apartin exact acelorasi simboluri de pe tranzitii
+    def __init__(self, symbols: Iterable['str | CharSet']):
+        symbols = list(dict.fromkeys(symbols))
+        sets = [CharSet.of(symbol) for symbol in symbols]
+        #capetele intervalelor elementare
+        points = {0, MAX_CODEPOINT + 1}
+        for charset in sets:
+            for lo, hi in charset.ranges:
+                points.add(lo)
+                points.add(hi + 1)
+        #intervalul elementar k este [bounds[k], bounds[k + 1])
+        self.bounds: list[int] = sorted(points)
+        #semnatura fiecarui interval elementar = simbolurile care il contin
+        signatures: list[list[int]] = [[] for _ in range(len(self.bounds) - 1)]
+        for idx, charset in enumerate(sets):
+            for lo, hi in charset.ranges:
+                first = bisect_right(self.bounds, lo) - 1
+                last = bisect_right(self.bounds, hi) - 1
+                for k in range(first, last + 1):
+                    signatures[k].append(idx)
+        #intervalele cu aceeasi semnatura formeaza o clasa
+        class_of_signature: dict[tuple[int, ...], int] = {}
+        self.interval_class: list[int] = []
+        self.classes: list[list[tuple[int, int]]] = []
+        self.symbol_classes: dict[str | CharSet, list[int]] = {symbol: [] for symbol in symbols}
+        for k, signature in enumerate(signatures):
+            if not signature:
+                #caracterele care nu apar pe nicio tranzitie nu au clasa
+                self.interval_class.append(-1)
+                continue
+            key = tuple(signature)
+            if key not in class_of_signature:
+                class_of_signature[key] = len(self.classes)
+                self.classes.append([])
+                for idx in signature:
+                    self.symbol_classes[symbols[idx]].append(class_of_signature[key])
+            cls = class_of_signature[key]
+            self.classes[cls].append((self.bounds[k], self.bounds[k + 1] - 1))
+            self.interval_class.append(cls)
+        self.lookup = _ClassMap(self)
+        for code in range(128):
+            self.lookup[chr(code)] = self.classify(chr(code))
+
+    @classmethod
+    def from_intervals(cls, bounds: list[int], interval_class: list[int]) -> 'Alphabet':
+        #reconstruim partitia salvata (fara simbolurile din care a fost calculata)
+        alphabet = cls.__new__(cls)
+        alphabet.bounds = bounds
+        alphabet.interval_class = interval_class
+        alphabet.classes = [[] for _ in range(max(interval_class, default=-1) + 1)]
+        for k, cls_id in enumerate(interval_class):
+            if cls_id >= 0:
+                alphabet.classes[cls_id].append((bounds[k], bounds[k + 1] - 1))
+        alphabet.symbol_classes = {}
+        alphabet.lookup = _ClassMap(alphabet)
+        for code in range(128):
+            alphabet.lookup[chr(code)] = alphabet.classify(chr(code))
+        return alphabet
+
+    def classify(self, char: str) -> int:
+        #clasa caracterului, -1 daca nu apare pe nicio tranzitie
+        return self.interval_class[bisect_right(self.bounds, ord(char)) - 1]
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+
+def utf8_ranges(lo: int, hi: int) -> list[tuple[tuple[int, int], ...]]:
+    # imparte intervalul de coduri [lo, hi] in secvente de intervale de octeti:
+    # un caracter din interval se codifica utf-8 exact printr-o secventa ai carei
+    # octeti cad, pe rand, in intervalele uneia dintre secvente
+    result = []
+    stack = [(lo, hi)]
+    while stack:
+        a, b = stack.pop()
+        if a > b:
+            continue
+        # surogatele nu au codificare utf-8
+        if a <= 0xDFFF and b >= 0xD800:
+            stack.append((a, 0xD7FF))
+            stack.append((0xE000, b))
+            continue
+        # ambele capete trebuie sa aiba acelasi numar de octeti
+        for limit in (0x7F, 0x7FF, 0xFFFF):
+            if a <= limit < b:
+                stack.append((a, limit))
+                stack.append((limit + 1, b))
+                break
+        else:
+            if b <= 0x7F:
+                result.append(((a, b),))
+                continue
+            # octetii de continuare trebuie sa acopere intervale complete
+            for i in range(1, len(chr(a).encode('utf-8', 'surrogatepass'))):
+                m = (1 << (6 * i)) - 1
+                if a & ~m != b & ~m:
+                    if a & m != 0:
+                        stack.append((a, a | m))
+                        stack.append(((a | m) + 1, b))
+                        break
+                    if b & m != m:
+                        stack.append((a, (b & ~m) - 1))
+                        stack.append((b & ~m, b))
+                        break
+            else:
+                result.append(tuple(zip(chr(a).encode('utf-8'), chr(b).encode('utf-8'))))
+    return result
@@ -1,3 +1,4 @@
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass
 from itertools import product
@@ -5,6 +6,8 @@ import pandas as pd
 from typing import TypeVar
 from functools import reduce
 
+from .CharSet import Alphabet
+
 STATE = TypeVar('STATE')
 
 
@@ -15,12 +18,17 @@ class DFA[STATE]:
     q0: STATE
     d: dict[tuple[STATE, str], STATE]
     F: set[STATE]
+    # daca exista, S contine clasele de echivalenta ale alfabetului (int-uri)
+    classes: Alphabet | None = None
 
     def accept(self, word: str) -> bool:
         #preluam starea intitala
         q = self.q0
         #parcurgem caracter cu caracter din cuvant
         for char in word:
+            #pe dfa-urile cu clase, tranzitia se face pe clasa caracterului
+            if self.classes is not None:
+                char = self.classes.lookup[char]
             #realizam tranzitiile
             q = self.d[(q, char)]
         #daca starea in care am ajuns e finala acceptam
@@ -31,39 +39,61 @@ class DFA[STATE]:
             return False
 
 
-    def minimize(self) -> 'DFA[STATE]':
-        #Hopcroft
-
-        P = [set(self.F), set(self.K) - set(self.F)]
-        W = [set(self.F)]
-
+    def minimize(self, key: Callable[[STATE], object] | None = None) -> 'DFA[STATE]':
+        #Hopcroft, cu rafinarea partitiei pe baza tranzitiilor inverse
+        #partitia initiala grupeaza starile dupa key (implicit: finala / nefinala);
+        #lexer-ul foloseste token-ul acceptat, ca sa nu uneasca tokeni diferiti
+        if key is None:
+            key = lambda q: q in self.F
+        states = list(self.K)
+        #indexul invers: (simbol, stare) -> starile care ajung in ea pe simbol
+        inverse: dict[tuple[str, STATE], list[STATE]] = {}
+        for (q, c), target in self.d.items():
+            inverse.setdefault((c, target), []).append(q)
+        #blocurile partitiei si blocul fiecarei stari
+        blocks: list[set[STATE]] = []
+        block_of: dict[STATE, int] = {}
+        initial: dict[object, int] = {}
+        for q in states:
+            k = key(q)
+            if k not in initial:
+                initial[k] = len(blocks)
+                blocks.append(set())
+            blocks[initial[k]].add(q)
+            block_of[q] = initial[k]
+        #lista de spargatori; pe langa coada tinem si o multime pentru test rapid
+        W = deque(range(len(blocks)))
+        in_W = set(W)
         while W:
-            A = W.pop(0)
+            A = W.popleft()
+            in_W.discard(A)
+            splitter = list(blocks[A])
             for c in self.S:
-                X_c = set()
-                for q in self.K:
-                    if  self.d[(q, c)] in A:
-                        X_c.add(q)
-                P_second = []
-                for Y in P:
-                    Y1 = Y.intersection(X_c)
-                    Y2 = Y.difference(X_c)
-                    if Y1 and Y2:
-                        P_second.extend([Y1, Y2])
-                        if Y not in W:
-                            if len(Y1) >= len(Y2):
-                                W.append(Y2)
-                            else:
-                                W.append(Y1)
-                        else:
-                            W.remove(Y)
-                            W.extend([Y1, Y2])
+                #X_c = starile care ajung in A pe c, grupate pe blocuri
+                touched: dict[int, set[STATE]] = {}
+                for target in splitter:
+                    for q in inverse.get((c, target), ()):
+                        touched.setdefault(block_of[q], set()).add(q)
+                for Y, Y1 in touched.items():
+                    if len(Y1) == len(blocks[Y]):
+                        continue
+                    #spargem Y: partea din X_c primeste un bloc nou
+                    blocks[Y] -= Y1
+                    new_block = len(blocks)
+                    blocks.append(Y1)
+                    for q in Y1:
+                        block_of[q] = new_block
+                    if Y in in_W:
+                        W.append(new_block)
+                        in_W.add(new_block)
                     else:
-                        P_second.append(Y)
-                P = P_second
+                        #e suficient sa adaugam partea mai mica
+                        smaller = new_block if len(Y1) <= len(blocks[Y]) else Y
+                        W.append(smaller)
+                        in_W.add(smaller)
         #construim mappingul starilor vechi catre starile noi
         state_map = {}
-        for c in P:
+        for c in blocks:
             if c:
                 representative = next(iter(c))
                 for q in c:
@@ -83,7 +113,7 @@ class DFA[STATE]:
                 new_target_mapped = state_map[target]
                 new_transitions[(new_q, a)] = new_target_mapped
 
-        return DFA(self.S, new_states, new_start, new_transitions, new_final)
+        return DFA(self.S, new_states, new_start, new_transitions, new_final, self.classes)
 
 
     def remap_states[OTHER_STATE](self, f: 'Callable[[STATE], OTHER_STATE]') -> 'NFA[OTHER_STATE]':
@@ -102,4 +132,4 @@ class DFA[STATE]:
         for (state, char), target in self.d.items():
             d[(f(state), char)] = f(target)
 
-        return DFA(self.S, k, q0, d, F)
\ No newline at end of file
+        return DFA(self.S, k, q0, d, F, self.classes)
\ No newline at end of file
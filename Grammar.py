@@ -1,4 +1,12 @@
-from .ParseTree import ParseTree
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING
+
+from .CYKChart import Backpointer, CYKChart
+from .LALR import LALRTable
+from .TokenBuffer import TokenBuffer
+
+if TYPE_CHECKING:
+    from .NumpyCYK import NumpyCYK
 EPSILON = ""
 
 class Grammar:
@@ -8,6 +16,7 @@ class Grammar:
         with open(file_name, 'r') as f:
             V = set()
             R = set()
+            P = []
             S = None
             line = f.readline().strip()
             while line:
@@ -18,80 +27,143 @@ class Grammar:
 
                 alternatives = rest.split("|")
                 for alt in alternatives:
-                    if " " in alt:
-                        n1, n2 = alt.split(" ")
-                        V.add(n1)
-                        V.add(n2)
-                        R.add((v, n1, n2))
-                    else: 
-                        V.add(alt)
-                        R.add((v, alt, None))
-            
+                    symbols = tuple(symbol for symbol in alt.split(" ") if symbol != EPSILON)
+                    #toate alternativele sunt productii; cele in FNC sunt si reguli pentru CYK
+                    P.append((v, symbols))
+                    V.update(symbols)
+                    if len(symbols) == 2:
+                        R.add((v, symbols[0], symbols[1]))
+                    elif len(symbols) == 1:
+                        R.add((v, symbols[0], None))
+
                 line = f.readline().strip()
 
-        return cls(V, R, S)
-    
-    def __init__(self, V: set[str], R: set[tuple[str, str, str|None]], S: str):
+        return cls(V, R, S, P)
+
+    def __init__(self, V: set[str], R: set[tuple[str, str, str|None]], S: str,
+                 P: list[tuple[str, tuple[str, ...]]] | None = None):
         self.V = V # multimea de neterminali si terminali
         self.R = R # regulile (in FNC)
         self.S = S # simbolul de start
+        # productiile generale (orice lungime), in ordinea declararii; implicit cele din R
+        if P is None:
+            P = [(x, (y,) if z is None else (y, z)) for x, y, z in sorted(self.R, key=str)]
+        self.P = P
+        # CYK se poate folosi doar daca toate productiile sunt in FNC: X -> terminal sau
+        # X -> Y Z cu Y, Z neterminali (CYK potriveste un corp de un simbol doar ca tip de token)
+        nonterminals = {x for x, _ in P}
+        self.cnf = all(len(rhs) == 1 and rhs[0] not in nonterminals
+                       or len(rhs) == 2 and rhs[0] in nonterminals and rhs[1] in nonterminals
+                       for _, rhs in P)
+        self._lalr: LALRTable | None = None
+        self._numpy_cyk: 'NumpyCYK | None' = None
+        self._compile()
+
+    def lalrTable(self) -> LALRTable:
+        #tabelele LALR(1), construite la prima cerere; conflictele sunt in table.conflicts
+        if self._lalr is None:
+            self._lalr = LALRTable(self.P, self.S)
+        return self._lalr
+
+    def lalrParse(self, w: Iterable[tuple[str, str]] | TokenBuffer):
+        #parsare in timp liniar cu tabelele LALR(1), acelasi arbore ca cykParse;
+        #w poate fi si un iterator de tokeni, consumat pe masura ce se parseaza
+        return self.lalrTable().parse(w)
         
-    def cykParse(self, w: list[tuple[str, str]]):
-        length = len(w)
-        #matrice pentru algoritmul CYK
-        table = []
-        for i in range(length + 1):
-            row = []
-            for j in range(length):
-                row.append({})
-            table.append(row)
+    def _compile(self) -> None:
+        #indexam regulile: neterminalii primesc numere (in ordine alfabetica, ca rezultatul
+        #sa nu depinda de ordinea din multimea R), iar multimile de neterminali devin masti de biti
+        heads = sorted({rule[0] for rule in self.R})
+        self._names = heads
+        number = {name: i for i, name in enumerate(heads)}
+        #terminal -> masca neterminalilor X cu X -> terminal
+        self._unit: dict[str, int] = {}
+        #Y -> {Z: masca neterminalilor X cu X -> Y Z}, plus masca tuturor Z posibili dupa Y
+        self._binary: dict[int, dict[int, int]] = {}
+        self._right: dict[int, int] = {}
+        for x, y, z in self.R:
+            if z is None:
+                self._unit[y] = self._unit.get(y, 0) | 1 << number[x]
+            elif y in number and z in number:
+                #Y sau Z fara reguli proprii nu pot aparea in tabel
+                pairs = self._binary.setdefault(number[y], {})
+                pairs[number[z]] = pairs.get(number[z], 0) | 1 << number[x]
+                self._right[number[y]] = self._right.get(number[y], 0) | 1 << number[z]
+
+    def cykParse(self, w: list[tuple[str, str]] | TokenBuffer, backend: str = 'python'):
+        #backend='numpy': varianta vectorizata (NumpyCYK), pentru secvente lungi de tokeni
+        if backend == 'numpy':
+            #importat doar aici: numpy costa la import si nu e folosit de celelalte backend-uri
+            from .NumpyCYK import NumpyCYK
+            types, lexeme = self._token_types(w)
+            if self._numpy_cyk is None:
+                self._numpy_cyk = NumpyCYK(self._names, self._unit, self._binary)
+            return self._numpy_cyk.parse(types, lexeme, self.S)
+        if backend != 'python':
+            raise ValueError(f"Unknown CYK backend {backend!r}")
+        #construim doar arborele simbolului de start
+        return self.cykChart(w).tree(self.S)
+
+    @staticmethod
+    def _token_types(w: list[tuple[str, str]] | TokenBuffer) -> tuple[list[str], Callable[[int], str]]:
+        #tipurile tokenilor; dintr-un TokenBuffer le luam fara sa construim tupluri
+        if isinstance(w, TokenBuffer):
+            return list(w.type_names()), w.lexeme
+        return [token[0] for token in w], lambda i: w[i][1]
+
+    def cykChart(self, w: list[tuple[str, str]] | TokenBuffer) -> CYKChart:
+        #tabelul CYK complet; celulele retin doar masti de biti si backpointeri,
+        #arborii se construiesc la cerere cu chart.tree(simbol, start, lungime)
+        types, lexeme = self._token_types(w)
+        length = len(types)
+        binary = self._binary
+        right_of = self._right
+        #matrice pentru algoritmul CYK: cells[j][i] e masca neterminalilor care genereaza
+        #subcuvantul de lungime j de la pozitia i; back[j][i] retine pentru fiecare dintre ei
+        #prima impartire gasita
+        cells = [[]]
+        back = [[]]
 
         #umplerea primei linii
-        for i in range(length):
-            #tipul token-ului si lexema
-            token = w[i][0]
-            lexeme = w[i][1]
-            #verificam regulile gramaticale
-            for rule in self.R:
-                x = rule[0]
-                y = rule[1]
-                z = rule[2]
-                #verificam regula sa fie valida
-                if z is None:
-                    if y == token:
-                        #adaugam in tabel
-                        table[1][i][x] = ParseTree(x, (token, lexeme))
+        unit = self._unit
+        cells.append([unit.get(token, 0) for token in types])
+        back.append([None] * length)
 
         #umplerea celorlalte linii
         #j reprezinta lungimea subcuvantului
         for j in range(2, length + 1):
+            row = []
+            row_back = []
             #i reprezinta pozitia de start a subcuvantului
             for i in range(length - j + 1):
+                cell = 0
+                pointers = {}
                 #k reprezinta pozitia de impartire a subcuvantului
                 for k in range(1, j):
-                    #verificam regulile gramaticale
-                    for rule in self.R:
-                        x = rule[0]
-                        y = rule[1]
-                        z = rule[2]
-                        #verificam daca regula este de forma X -> Y Z
-                        if z is not None:
-                            if y in table[k][i] and z in table[j - k][i + k]:
-                                if x not in table[j][i]:
-                                    #construim arborele de parsare
-                                    tree = ParseTree(x)
-                                    tree.add_children(table[k][i][y])
-                                    tree.add_children(table[j - k][i + k][z])
-                                    table[j][i][x] = tree
-
-        #verificam simbolul de start
-        if self.S not in table[length][0]:
-            return None
-        return table[length][0][self.S]
-
-
-
-        
-
-            
-
+                    left = cells[k][i]
+                    right = cells[j - k][i + k]
+                    if not left or not right:
+                        continue
+                    #parcurgem bitii Y din stanga, apoi bitii Z din dreapta care apar in reguli
+                    while left:
+                        low = left & -left
+                        left ^= low
+                        y = low.bit_length() - 1
+                        candidates = right & right_of.get(y, 0)
+                        while candidates:
+                            low_z = candidates & -candidates
+                            candidates ^= low_z
+                            z = low_z.bit_length() - 1
+                            new = binary[y][z] & ~cell
+                            if new:
+                                cell |= new
+                                pointer = Backpointer(k, y, z)
+                                while new:
+                                    low_x = new & -new
+                                    new ^= low_x
+                                    pointers[low_x.bit_length() - 1] = pointer
+                row.append(cell)
+                row_back.append(pointers)
+            cells.append(row)
+            back.append(row_back)
+        return CYKChart(self._names, cells, back, types, lexeme)
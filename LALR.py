@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from .ParseTree import ParseTree
+from .TokenBuffer import TokenBuffer
+
+#simbolul de sfarsit al intrarii si capul productiei augmentate $accept -> S
+END = "$end"
+ACCEPT = "$accept"
+
+
+class LALRTable:
+    # tabelele action/goto LALR(1) pentru o gramatica independenta de context oarecare
+    # (productii de orice lungime, inclusiv vide); neterminalii sunt capetele productiilor,
+    # restul simbolurilor sunt tipuri de tokeni. In action, o valoare >= 0 inseamna shift
+    # in starea respectiva, iar ~p reducere cu productia p (reducerea cu 0 = acceptare)
+    def __init__(self, productions: list[tuple[str, tuple[str, ...]]], start: str) -> None:
+        self.productions = [(ACCEPT, (start,))] + list(productions)
+        self.start = start
+        self.by_head: dict[str, list[int]] = {}
+        for p, (head, _) in enumerate(self.productions):
+            self.by_head.setdefault(head, []).append(p)
+        self._first_sets()
+        self._lr0_automaton()
+        self._lookaheads()
+        self._build_actions()
+
+    def _first_sets(self) -> None:
+        #multimile FIRST si neterminalii care pot genera sirul vid, prin punct fix
+        self.nullable: set[str] = set()
+        self.first: dict[str, set[str]] = {head: set() for head in self.by_head}
+        changed = True
+        while changed:
+            changed = False
+            for head, rhs in self.productions:
+                first = self.first[head]
+                size = len(first)
+                for symbol in rhs:
+                    if symbol not in self.by_head:
+                        first.add(symbol)
+                        break
+                    first |= self.first[symbol]
+                    if symbol not in self.nullable:
+                        break
+                else:
+                    if head not in self.nullable:
+                        self.nullable.add(head)
+                        changed = True
+                changed = changed or len(first) != size
+
+    def _first_of(self, symbols: tuple[str, ...]) -> tuple[set[str], bool]:
+        #FIRST(symbols) si daca symbols poate genera sirul vid
+        result: set[str] = set()
+        for symbol in symbols:
+            if symbol not in self.by_head:
+                result.add(symbol)
+                return result, False
+            result |= self.first[symbol]
+            if symbol not in self.nullable:
+                return result, False
+        return result, True
+
+    def _expansions(self) -> None:
+        #pentru fiecare neterminal X, itemii (q, 0) din inchiderea lui "punct X", fiecare cu
+        #lookahead-urile generate spontan in inchidere si un flag care spune daca primeste si
+        #lookahead-urile de dupa X; nu depind de stare, deci le calculam o singura data
+        self.expansions: dict[str, dict[tuple[int, int], tuple[set[str], bool]]] = {}
+        tails = [self._first_of(rhs[1:]) for _, rhs in self.productions]
+        for nonterminal in self.by_head:
+            items = {(q, 0): [set(), True] for q in self.by_head[nonterminal]}
+            stack = list(items)
+            while stack:
+                p, _ = stack.pop()
+                rhs = self.productions[p][1]
+                if not rhs or rhs[0] not in self.by_head:
+                    continue
+                spontaneous, propagates = items[(p, 0)]
+                first, nullable = tails[p]
+                lookahead = first | spontaneous if nullable else first
+                inherits = propagates and nullable
+                for q in self.by_head[rhs[0]]:
+                    entry = items.get((q, 0))
+                    if entry is None:
+                        items[(q, 0)] = [set(lookahead), inherits]
+                        stack.append((q, 0))
+                    elif not lookahead <= entry[0] or inherits > entry[1]:
+                        entry[0] |= lookahead
+                        entry[1] = entry[1] or inherits
+                        stack.append((q, 0))
+            self.expansions[nonterminal] = {item: (spontaneous, propagates)
+                                            for item, (spontaneous, propagates) in items.items()}
+
+    def _closure(self, state: int) -> dict[tuple[int, int], set[str]]:
+        #inchiderea LR(1) a unei stari; un item (p, d) e productia p cu punctul inaintea
+        #simbolului d, fiecare item avand multimea lui de simboluri de lookahead
+        kernel = self.lookaheads[state]
+        items = {item: set(lookahead) for item, lookahead in kernel.items()}
+        for (p, d), lookahead in kernel.items():
+            rhs = self.productions[p][1]
+            if d == len(rhs) or rhs[d] not in self.by_head:
+                continue
+            first, nullable = self._first_of(rhs[d + 1:])
+            for item, (spontaneous, propagates) in self.expansions[rhs[d]].items():
+                current = items.setdefault(item, set())
+                current |= spontaneous
+                if propagates:
+                    current |= first
+                    if nullable:
+                        current |= lookahead
+        return items
+
+    def _lr0_automaton(self) -> None:
+        #starile LR(0), date de nucleele lor, si tranzitiile intre ele
+        self._expansions()
+        self.kernels: list[tuple[tuple[int, int], ...]] = [((0, 0),)]
+        self.lookaheads: list[dict[tuple[int, int], set[str]]] = [{(0, 0): set()}]
+        self.transitions: list[dict[str, int]] = []
+        index = {self.kernels[0]: 0}
+        state = 0
+        while state < len(self.kernels):
+            targets: dict[str, list[tuple[int, int]]] = {}
+            for p, d in sorted(self._closure(state)):
+                rhs = self.productions[p][1]
+                if d < len(rhs):
+                    targets.setdefault(rhs[d], []).append((p, d + 1))
+            moves = {}
+            for symbol, kernel in targets.items():
+                kernel = tuple(kernel)
+                if kernel not in index:
+                    index[kernel] = len(self.kernels)
+                    self.kernels.append(kernel)
+                    self.lookaheads.append({item: set() for item in kernel})
+                moves[symbol] = index[kernel]
+            self.transitions.append(moves)
+            state += 1
+
+    def _lookaheads(self) -> None:
+        #lookahead-urile itemilor din nuclee: cele generate spontan se adauga direct, iar
+        #legaturile de propagare (item -> item din starea urmatoare) se parcurg pana la punct fix
+        self.lookaheads[0][(0, 0)].add(END)
+        links: dict[tuple[int, tuple[int, int]], list[tuple[int, tuple[int, int]]]] = {}
+        for state, kernel in enumerate(self.kernels):
+            moves = self.transitions[state]
+            for p, d in kernel:
+                rhs = self.productions[p][1]
+                if d == len(rhs):
+                    continue
+                targets = links.setdefault((state, (p, d)), [])
+                targets.append((moves[rhs[d]], (p, d + 1)))
+                if rhs[d] not in self.by_head:
+                    continue
+                first, nullable = self._first_of(rhs[d + 1:])
+                for (q, _), (spontaneous, propagates) in self.expansions[rhs[d]].items():
+                    body = self.productions[q][1]
+                    if not body:
+                        continue
+                    target = moves[body[0]]
+                    lookahead = self.lookaheads[target][(q, 1)]
+                    lookahead |= spontaneous
+                    if propagates:
+                        lookahead |= first
+                        if nullable:
+                            targets.append((target, (q, 1)))
+        worklist = [(state, item) for state, kernel in enumerate(self.lookaheads)
+                    for item, lookahead in kernel.items() if lookahead]
+        while worklist:
+            state, item = worklist.pop()
+            lookahead = self.lookaheads[state][item]
+            for target, target_item in links.get((state, item), ()):
+                current = self.lookaheads[target][target_item]
+                if not lookahead <= current:
+                    current |= lookahead
+                    worklist.append((target, target_item))
+
+    def _describe(self, p: int) -> str:
+        head, rhs = self.productions[p]
+        return f"{head} -> {' '.join(rhs) or 'eps'}"
+
+    def _build_actions(self) -> None:
+        #la conflicte pastram, ca yacc, shift-ul sau productia declarata prima,
+        #dar le raportam pe toate in conflicts
+        self.action: list[dict[str, int]] = []
+        self.goto: list[dict[str, int]] = []
+        self.conflicts: list[str] = []
+        for state, moves in enumerate(self.transitions):
+            action = {symbol: target for symbol, target in moves.items() if symbol not in self.by_head}
+            self.goto.append({symbol: target for symbol, target in moves.items() if symbol in self.by_head})
+            for (p, d), lookahead in sorted(self._closure(state).items()):
+                if d != len(self.productions[p][1]):
+                    continue
+                for symbol in sorted(lookahead):
+                    existing = action.get(symbol)
+                    if existing is None:
+                        action[symbol] = ~p
+                    elif existing >= 0:
+                        self.conflicts.append(f"shift/reduce conflict in state {state} on {symbol!r}: "
+                                              f"shift or reduce {self._describe(p)}")
+                    elif existing != ~p:
+                        self.conflicts.append(f"reduce/reduce conflict in state {state} on {symbol!r}: "
+                                              f"{self._describe(~existing)} or {self._describe(p)}")
+            self.action.append(action)
+
+    def parse(self, w: Iterable[tuple[str, str]] | TokenBuffer) -> ParseTree | None:
+        #parsare LR in timp liniar; tokenii sunt consumati pe rand, deci w poate fi si un
+        #iterator (de exemplu Lexer.lex_stream). Arborele are aceeasi forma ca cel dat de
+        #cykParse: o productie X -> terminal devine frunza X cu token-ul, un terminal intr-o
+        #productie mai lunga devine o frunza cu numele tipului token-ului
+        if isinstance(w, TokenBuffer):
+            #dintr-un TokenBuffer citim doar tipurile, lexemele se construiesc doar in frunze
+            tokens = zip(w.type_names(), range(len(w)))
+            lexeme = w.lexeme
+        else:
+            tokens = iter(w)
+            lexeme = None
+        action = self.action
+        goto = self.goto
+        productions = self.productions
+        nonterminals = self.by_head
+        states = [0]
+        #pe stiva de valori: arbori pentru neterminali, (tip, lexem) pentru terminali
+        values: list[ParseTree | tuple[str, str]] = []
+        token, value = next(tokens, (END, None))
+        while True:
+            move = action[states[-1]].get(token)
+            if move is None:
+                return None
+            if move >= 0:
+                states.append(move)
+                values.append((token, value if lexeme is None else lexeme(value)))
+                token, value = next(tokens, (END, None))
+                continue
+            p = ~move
+            if p == 0:
+                return values[0]
+            head, rhs = productions[p]
+            count = len(rhs)
+            children = values[len(values) - count:]
+            if count:
+                del values[-count:]
+                del states[-count:]
+            if count == 1 and rhs[0] not in nonterminals:
+                tree = ParseTree(head, children[0])
+            else:
+                tree = ParseTree(head)
+                for symbol, child in zip(rhs, children):
+                    if symbol in nonterminals:
+                        tree.add_children(child)
+                    else:
+                        tree.add_children(ParseTree(symbol, child))
+            states.append(goto[states[-1]][head])
+            values.append(tree)
@@ -1,5 +1,36 @@
-from .Regex import Regex, parse_regex
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import warnings
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import IO
+
+from .Regex import AST_CACHE, NFA_CACHE, Regex, StateCounter, compile_regex, optimize_regex, parse_regex_cached
 from .NFA import NFA, EPSILON
+from .CharSet import Alphabet, utf8_ranges
+from .TokenBuffer import TokenBuffer, TokenEdit
+from .LRUCache import LRUCache
+from .LexerStats import LexerStats, RuleStats
+from . import __version__
+
+#formatul binar al unui lexer compilat; antetul fix e magic, versiune, lungimea
+#header-ului json si crc32-ul restului datelor
+FORMAT_MAGIC = b'LEXC'
+FORMAT_VERSION = 2
+FORMAT_PREFIX = struct.Struct('<HII')
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'lexer')
+#lexerele construite in proces, cheia e (spec, minimize)
+LEXER_CACHE: 'LRUCache[Lexer]' = LRUCache(64)
 
 
 def remap_func_factory(idx):
@@ -7,104 +38,1089 @@ def remap_func_factory(idx):
         return idx, state
     return remap
 
+
+def build_rule_nfa(rule: tuple[int, tuple[str, str]]) -> tuple[NFA, int, str]:
+    #NFA-ul unei singure reguli din spec, cu starile remapate la (index, stare);
+    #functie la nivel de modul ca sa poata rula si intr-un ProcessPoolExecutor
+    i, (token_type, regex_str) = rule
+    nfa = compile_regex(regex_str)
+    return nfa.remap_states(remap_func_factory(i)), i, token_type
+
+
+def build_rule_nfa_timed(rule: tuple[int, tuple[str, str]]) -> tuple[NFA, int, str, LexerStats]:
+    #ca build_rule_nfa, dar masoara separat fazele si inregistreaza dimensiunile automatelor regulii
+    #intr-un LexerStats propriu, adunat apoi de Lexer; poate rula si intr-un executor
+    stats = LexerStats()
+    i, (token_type, regex_str) = rule
+    with stats.phase('regex_parse'):
+        ast = parse_regex_cached(regex_str)
+    with stats.phase('optimize'):
+        ast = optimize_regex(ast)
+    with stats.phase('thompson'):
+        nfa = NFA_CACHE.get_or_build(regex_str, lambda: ast.thompson(StateCounter()))
+    with stats.phase('remap'):
+        remapped = nfa.remap_states(remap_func_factory(i))
+    #dfa-ul regulii singure, construit doar pentru statistici
+    dfa = nfa.subset_construction()
+    stats.rules.append(RuleStats(
+        token_type, len(nfa.K), sum(len(targets) for targets in nfa.d.values()),
+        sum(1 for state in dfa.K if state), sum(1 for target in dfa.d.values() if target)))
+    return remapped, i, token_type, stats
+
+
+def combine_rule_nfas(nfas: list[tuple[NFA, int, str]]) -> tuple[NFA, dict]:
+    #combinam NFA-urile regulilor (rezultatele lui build_rule_nfa) intr-unul singur, cu o
+    #stare de start noua; intoarcem si starile finale cu (prioritate, nume) pentru fiecare
+    new_start = "LEXER_START"
+    #setam starile de start ale NFA-urilor individuale
+    start_states = set()
+    for nfa, _, _ in nfas:
+        start_states.add(nfa.q0)
+    #construim dicționarul într-un mod clasic
+    combined_d = {}
+    combined_d[(new_start, EPSILON)] = start_states
+    #combinam starile de start si finale
+    combined_K = {new_start}
+    combined_S = set()
+    finals = {}
+    #combinam toate NFA-urile
+    for nfa, priority, name in nfas:
+        combined_K.update(nfa.K)
+        combined_S.update(nfa.S)
+        combined_d.update(nfa.d)
+        for f_state in nfa.F:
+            finals[f_state] = (priority, name)
+    return NFA(combined_S, combined_K, new_start, combined_d, set(finals.keys())), finals
+
+
+#lexerul incarcat in fiecare proces din worker_pool
+_WORKER_LEXER: 'Lexer | None' = None
+
+
+def _init_worker(payload: bytes) -> None:
+    global _WORKER_LEXER
+    _WORKER_LEXER = Lexer.loads(payload)
+
+
+def _lex_chunk(chunk: str, base: int, complete: bool, compact: bool,
+               skipped: frozenset[int]) -> tuple[array, array, array, int, list | None, array]:
+    return _WORKER_LEXER._lex_offsets(chunk, base, complete, compact, skipped)
+
+
+def _lex_batch(docs: list[str], compact: bool, linear: bool, skip: tuple[str, ...]) -> list:
+    lex = _WORKER_LEXER.lex
+    return [lex(doc, compact, linear, skip) for doc in docs]
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    #scriem intr-un fisier temporar din acelasi director, apoi il redenumim, ca un
+    #cititor sa vada fie fisierul vechi, fie pe cel nou complet
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def map_batches(executor: Executor, function: Callable[..., list], items: Iterable,
+                chunksize: int, ordered: bool, *args, max_pending: int = 32) -> Iterator:
+    #aplica function pe loturi de cate chunksize elemente, in executor; cel mult max_pending
+    #loturi sunt in lucru, deci items poate fi un iterator oricat de lung.
+    #ordered=True: rezultatele in ordinea intrarii; altfel perechi (index, rezultat)
+    #in ordinea in care se termina loturile
+    iterator = iter(items)
+    position = 0
+    pending: deque[tuple[int, Future]] | set[Future] = deque() if ordered else set()
+    starts: dict[Future, int] = {}
+
+    def submit() -> bool:
+        nonlocal position
+        batch = list(islice(iterator, chunksize))
+        if not batch:
+            return False
+        future = executor.submit(function, batch, *args)
+        if ordered:
+            pending.append((position, future))
+        else:
+            pending.add(future)
+            starts[future] = position
+        position += len(batch)
+        return True
+
+    while len(pending) < max_pending and submit():
+        pass
+    while pending:
+        if ordered:
+            _, future = pending.popleft()
+            yield from future.result()
+            submit()
+            continue
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.discard(future)
+            start = starts.pop(future)
+            for offset, result in enumerate(future.result()):
+                yield start + offset, result
+            submit()
+
+
 class Lexer:
-    def __init__(self, spec: list[tuple[str, str]]) -> None:
+    # in modul lazy: de cate ori se poate goli cache-ul intr-un apel lex
+    # inainte sa trecem pe simularea nfa
+    MAX_CACHE_FLUSHES = 8
+
+    def __init__(self, spec: list[tuple[str, str]], minimize: bool = False,
+                 lazy: bool = False, cache_size: int = 4096,
+                 executor: Executor | None = None,
+                 stats: bool | Callable[[LexerStats], None] = False) -> None:
         self.spec = spec
-        nfas = []
-        #construim NFA-urile pentru fiecare specificație
-        for i, (token_type, regex_str) in enumerate(spec):
-            nfa = parse_regex(regex_str).thompson()
-            nfa_remap = nfa.remap_states(remap_func_factory(i))
-            nfas.append((nfa_remap, i, token_type))
+        #stats=True colecteaza statistici (vezi stats()); daca stats e o functie, e apelata
+        #cu statisticile dupa fiecare apel de lexare numarat. Fara stats nu se masoara nimic
+        self._stats = LexerStats() if stats else None
+        self._stats_hook = stats if callable(stats) else None
+        timed = self._stats is not None
+        #construim NFA-urile pentru fiecare specificație, optional in paralel
+        #pe un ThreadPoolExecutor / ProcessPoolExecutor primit de la apelant
+        #(cu statistici, fiecare regula isi masoara fazele, iar timpii se aduna)
+        if timed:
+            rule_map = map if executor is None else executor.map
+            nfas = []
+            for nfa, i, token_type, rule_stats in rule_map(build_rule_nfa_timed, enumerate(spec)):
+                self._stats.merge_build(rule_stats)
+                nfas.append((nfa, i, token_type))
+        elif executor is not None:
+            nfas = list(executor.map(build_rule_nfa, enumerate(spec)))
+        else:
+            nfas = [build_rule_nfa(rule) for rule in enumerate(spec)]
         #combinam NFA-urile intr-unul singur
-        new_start = "LEXER_START"
-        #setam starile de start ale NFA-urilor individuale
-        start_states = set()
-        for nfa, _, _ in nfas:
-            start_states.add(nfa.q0)
-        #construim dicționarul într-un mod clasic
-        combined_d = {}
-        combined_d[(new_start, EPSILON)] = start_states
-        #combinam starile de start si finale
-        combined_K = {new_start}
-        combined_S = set()
-        self.finals = {}
-        #combinam toate NFA-urile
-        for nfa, priority, name in nfas:
-            combined_K.update(nfa.K)
-            combined_S.update(nfa.S)
-            combined_d.update(nfa.d)
-            for f_state in nfa.F:
-                self.finals[f_state] = (priority, name)
-        #construim NFA-ul combinat si apoi DFA-ul prin subset construction
-        nfa= NFA(combined_S, combined_K, new_start, combined_d, set(self.finals.keys()))
-        self.dfa = nfa.subset_construction()
-
-    def lex(self, word: str) -> list[tuple[str, str]]:
-        #initializam variabilele necesare
+        if timed:
+            with self._stats.phase('combine'):
+                nfa, self.finals = combine_rule_nfas(nfas)
+            self._stats.nfa_states = len(nfa.K)
+        else:
+            nfa, self.finals = combine_rule_nfas(nfas)
+        self.token_names = [name for name, _ in spec]
+        self.lazy = lazy
+        if lazy:
+            #starile dfa se construiesc abia cand intrarea ajunge in ele
+            if minimize:
+                raise ValueError("A lazy lexer cannot be minimized")
+            self.dfa = None
+            self._init_lazy(nfa, cache_size)
+            return
+        if not timed:
+            self.dfa = nfa.subset_construction()
+            if minimize:
+                #starile care accepta tokeni diferiti pornesc in blocuri diferite
+                self.dfa = self.dfa.minimize(key=self._accepted_token)
+            self._compile(self.dfa)
+            return
+        with self._stats.phase('subset_construction'):
+            self.dfa = nfa.subset_construction()
+        if minimize:
+            with self._stats.phase('minimize'):
+                self.dfa = self.dfa.minimize(key=self._accepted_token)
+        with self._stats.phase('compile'):
+            self._compile(self.dfa)
+        self._stats.dfa_states = len(self._table) // (self._ncols + 1)
+
+    def _accepted_token(self, state) -> int:
+        #token-ul acceptat de o stare dfa: starea finala cu prioritatea cea mai mare
+        priorities = [self.finals[s][0] for s in state if s in self.finals]
+        return min(priorities) if priorities else -1
+
+    def _compile(self, dfa) -> None:
+        #compilam dfa-ul intr-un tabel dens de intregi
+        #coloanele sunt clasele de echivalenta ale alfabetului, ultima coloana e token-ul acceptat
+        self._alphabet = dfa.classes
+        self._columns = dfa.classes.lookup
+        ncols = len(dfa.classes)
+        stride = ncols + 1
+        #numerotam starile dfa in ordinea parcurgerii, sink state-ul ramane -1
+        numbers = {dfa.q0: 0}
+        order = [dfa.q0]
+        for state in order:
+            for col in range(ncols):
+                target = dfa.d.get((state, col))
+                if target and target not in numbers:
+                    numbers[target] = len(order)
+                    order.append(target)
+        table = array('i', [-1]) * (len(order) * stride)
+        for number, state in enumerate(order):
+            #o stare e identificata prin offset-ul randului ei in tabel
+            row = number * stride
+            for col in range(ncols):
+                target = dfa.d.get((state, col))
+                if target:
+                    table[row + col] = numbers[target] * stride
+            table[row + ncols] = self._accepted_token(state)
+        self._ncols = ncols
+        self._table = table
+        self._byte_table = None
+
+    def _compile_bytes(self) -> array:
+        #tabelul dfa-ului pe octeti utf-8: starile dfa-ului pe caractere pastreaza
+        #numerotarea (randul k), iar pentru caracterele pe mai multi octeti se adauga
+        #stari intermediare, comune tuturor starilor care au aceleasi continuari
+        stride = self._ncols + 1
+        count = len(self._table) // stride
+        table = array('i', [-1]) * (count * 257)
+        nodes: dict[frozenset, int] = {}
+
+        def fill(row: int, items: frozenset) -> None:
+            #items: (secventa de intervale de octeti ramasa, starea tinta)
+            points = set()
+            for ranges, _ in items:
+                points.add(ranges[0][0])
+                points.add(ranges[0][1] + 1)
+            points = sorted(points)
+            for lo, hi in zip(points, points[1:]):
+                group = frozenset((ranges[1:], target) for ranges, target in items
+                                  if ranges[0][0] <= lo and hi - 1 <= ranges[0][1])
+                if not group:
+                    continue
+                #o secventa completa nu e prefixul altei secvente, deci grupul are un singur element
+                ranges, target = next(iter(group))
+                if not ranges:
+                    destination = target * 257
+                else:
+                    destination = nodes.get(group)
+                    if destination is None:
+                        destination = len(table)
+                        nodes[group] = destination
+                        table.extend([-1] * 257)
+                        fill(destination, group)
+                for byte in range(lo, hi):
+                    table[row + byte] = destination
+
+        for number in range(count):
+            row = number * stride
+            items = set()
+            for col in range(self._ncols):
+                target = self._table[row + col]
+                if target < 0:
+                    continue
+                for lo, hi in self._alphabet.classes[col]:
+                    for ranges in utf8_ranges(lo, hi):
+                        items.add((ranges, target // stride))
+            table[number * 257 + 256] = self._table[row + self._ncols]
+            fill(number * 257, frozenset(items))
+        return table
+
+    def lex_bytes(self, data: bytes | bytearray | memoryview | mmap.mmap) -> list[tuple[int, int, int]]:
+        #lexeaza direct octeti utf-8 (bytes, bytearray, memoryview sau mmap), fara decodare;
+        #tokenii sunt (indexul token-ului in spec, start, end) cu offset-uri in octeti,
+        #end exclusiv; la eroare intoarce [(-1, start, pozitia cea mai departata)]
+        if self.lazy:
+            raise ValueError("lex_bytes needs the full DFA, it is not available on a lazy lexer")
+        if self._byte_table is None:
+            self._byte_table = self._compile_bytes()
+        table = self._byte_table
+        if isinstance(data, memoryview) and data.format != 'B':
+            data = data.cast('B')
         result = []
         index = 0
-        line_number = 0
-        line_start_index = 0
-        length = len(word)
-        #parcurgem sirul de intrare
+        length = len(data)
+        #cu statistici, contoarele numara octeti in loc de caractere
+        stats = self._start_counting(length)
         while index < length:
-            current_state = self.dfa.q0
+            current_state = 0
             last_final_pos = -1
-            best_token = None
-            #punctul cel mai departat de inceputul liniei la care ajungem
+            best_token = -1
             max_distance = index
-            #incercam sa gasim cel mai lung prefix valid
-            for i in range(index, len(word)):
-                #simbolul curent
-                symbol = word[i]
-                #daca nu exista tranzitie pentru simbolul curent, iesim din bucla
-                if (current_state, symbol) not in self.dfa.d:
-                    break
-                #starea urmatoare
-
-                next_state = self.dfa.d[(current_state, symbol)]
-                #verificam daca am ajuns in synk state
-                if not next_state:
+            for i in range(index, length):
+                current_state = table[current_state + data[i]]
+                if current_state < 0:
                     break
-                #actualizam starea curenta
-                current_state = next_state
-                #actualizam pozitia cea mai departata
                 max_distance = i + 1
-                #formam nfa-ul final
-                nfa = []
-                for s in current_state:
-                    if s in self.finals:
-                        nfa.append(s)
-                if nfa:
-                    #alegem starea finala cu proiritatea cea mai mare
-                    best_nfa_state = min(nfa, key=lambda s: self.finals[s][0])
-                    #actualizam token-ul corespunzator si ultima pozitie finala
-                    best_token = self.finals[best_nfa_state][1]
+                token = table[current_state + 256]
+                if token >= 0:
+                    best_token = token
                     last_final_pos = i
+            if last_final_pos == -1:
+                if stats is not None:
+                    stats.chars_scanned += max_distance - index
+                    self._stop_counting()
+                return [(-1, index, max_distance)]
+            if stats is not None:
+                stats.count_token(self.token_names[best_token], index, last_final_pos + 1, max_distance)
+            result.append((best_token, index, last_final_pos + 1))
+            index = last_final_pos + 1
+        if stats is not None:
+            self._stop_counting()
+        return result
 
-            #gestionam erorile
+    def lex_file(self, path: str) -> list[tuple[int, int, int]]:
+        #lexeaza un fisier utf-8 mapat in memorie, fara sa il citim intr-un str
+        with open(path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                #fisierele goale nu pot fi mapate
+                return []
+            with data:
+                return self.lex_bytes(data)
+
+    def stats(self) -> LexerStats | None:
+        #statisticile colectate, None daca sunt dezactivate
+        return self._stats
+
+    def _start_counting(self, chars: int) -> LexerStats | None:
+        #inceputul unui apel de lexare numarat in stats; None daca statisticile sunt oprite
+        stats = self._stats
+        if stats is not None:
+            stats.lex_calls += 1
+            stats.chars += chars
+        return stats
+
+    def _stop_counting(self) -> None:
+        if self._stats_hook is not None:
+            self._stats_hook(self._stats)
+
+    def _warn_uncounted(self, method: str) -> None:
+        #procesele din worker_pool au copii ale lexer-ului, fara statistici
+        warnings.warn(f"{method} lexes serially while statistics are enabled, "
+                      "worker processes cannot update them", RuntimeWarning, stacklevel=3)
+
+    def enable_stats(self, hook: Callable[[LexerStats], None] | None = None) -> LexerStats:
+        #porneste contoarele de lexare (de exemplu doar pentru un esantion de apeluri);
+        #timpii constructiei exista doar daca lexer-ul a fost creat cu stats
+        if self._stats is None:
+            self._stats = LexerStats()
+            if not self.lazy:
+                self._stats.dfa_states = len(self._table) // (self._ncols + 1)
+        self._stats_hook = hook
+        return self._stats
+
+    def disable_stats(self) -> None:
+        self._stats = None
+        self._stats_hook = None
+
+    def dumps(self) -> bytes:
+        #serializam lexerul compilat: tabelul dfa numerotat, alfabetul si tokenii
+        if self.lazy:
+            raise ValueError("A lazy lexer has no compiled table to save")
+        header = json.dumps({'spec': self.spec, 'ncols': self._ncols}).encode('utf-8')
+        parts = [header]
+        for values in (self._table, array('i', self._alphabet.bounds), array('i', self._alphabet.interval_class)):
+            data = array('i', values)
+            if sys.byteorder == 'big':
+                data.byteswap()
+            parts.append(struct.pack('<Q', len(data)))
+            parts.append(data.tobytes())
+        payload = b''.join(parts)
+        return FORMAT_MAGIC + FORMAT_PREFIX.pack(FORMAT_VERSION, len(header), zlib.crc32(payload)) + payload
+
+    @classmethod
+    def loads(cls, data: bytes) -> 'Lexer':
+        #reconstruim un lexer din dumps(), fara nicio constructie de automate
+        position = len(FORMAT_MAGIC) + FORMAT_PREFIX.size
+        if len(data) < position or data[:4] != FORMAT_MAGIC:
+            raise ValueError("Not a compiled lexer")
+        version, header_size, checksum = FORMAT_PREFIX.unpack_from(data, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled lexer format version {version}")
+        #crc-ul prinde orice octet modificat sau lipsa; verificarile de mai jos
+        #prind datele scrise gresit de la inceput
+        if zlib.crc32(data[position:]) != checksum:
+            raise ValueError("Corrupt compiled lexer: checksum mismatch")
+        header = json.loads(data[position:position + header_size].decode('utf-8'))
+        if (not isinstance(header, dict) or not isinstance(header.get('ncols'), int)
+                or header['ncols'] < 1 or not isinstance(header.get('spec'), list)
+                or not all(isinstance(rule, list) and len(rule) == 2
+                           and all(isinstance(part, str) for part in rule) for rule in header['spec'])):
+            raise ValueError("Corrupt compiled lexer: invalid header")
+        position += header_size
+        arrays = []
+        for _ in range(3):
+            if position + 8 > len(data):
+                raise ValueError("Corrupt compiled lexer: truncated data")
+            (count,) = struct.unpack_from('<Q', data, position)
+            position += 8
+            values = array('i')
+            values.frombytes(data[position:position + count * values.itemsize])
+            #o felie scurta (fisier trunchiat) nu da eroare la frombytes
+            if len(values) != count:
+                raise ValueError("Corrupt compiled lexer: truncated data")
+            if sys.byteorder == 'big':
+                values.byteswap()
+            position += count * values.itemsize
+            arrays.append(values)
+        table, bounds, interval_class = arrays
+        ncols = header['ncols']
+        stride = ncols + 1
+        #tabelul trebuie sa aiba randuri complete, iar fiecare interval al alfabetului o clasa
+        if (position != len(data) or not table or len(table) % stride
+                or len(bounds) < 2 or bounds[0] != 0 or len(interval_class) != len(bounds) - 1
+                or any(lo >= hi for lo, hi in zip(bounds, bounds[1:]))
+                or min(interval_class) < -1 or max(interval_class) >= ncols):
+            raise ValueError("Corrupt compiled lexer: inconsistent tables")
+        #tranzitiile sunt offset-uri de rand (multipli de stride) sau -1, iar ultima
+        #coloana e un token din spec sau -1; verificam doar valorile distincte
+        accepts = table[ncols::stride]
+        if min(accepts) < -1 or max(accepts) >= len(header['spec']):
+            raise ValueError("Corrupt compiled lexer: invalid accepted token")
+        targets = set()
+        for col in range(ncols):
+            targets.update(table[col::stride])
+        if any(target != -1 and (target < 0 or target % stride or target >= len(table)) for target in targets):
+            raise ValueError("Corrupt compiled lexer: invalid transition")
+        lexer = cls.__new__(cls)
+        lexer.spec = [tuple(rule) for rule in header['spec']]
+        lexer.token_names = [name for name, _ in lexer.spec]
+        lexer.finals = {}
+        lexer.lazy = False
+        lexer.dfa = None
+        lexer._alphabet = Alphabet.from_intervals(list(bounds), list(interval_class))
+        lexer._columns = lexer._alphabet.lookup
+        lexer._ncols = ncols
+        lexer._table = table
+        lexer._byte_table = None
+        lexer._stats = None
+        lexer._stats_hook = None
+        return lexer
+
+    def save(self, path: str) -> None:
+        _write_atomic(path, self.dumps())
+
+    @classmethod
+    def load(cls, path: str) -> 'Lexer':
+        with open(path, 'rb') as f:
+            return cls.loads(f.read())
+
+    @staticmethod
+    def cache_key(spec: list[tuple[str, str]], minimize: bool = False) -> str:
+        #cheia din cache: spec-ul, optiunile care schimba tabelul si versiunile
+        key = json.dumps([__version__, FORMAT_VERSION, [list(rule) for rule in spec], minimize])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def cached(cls, spec: list[tuple[str, str]], cache_dir: str | None = None,
+               minimize: bool = False, persistent: bool = True) -> 'Lexer':
+        #intai cautam in cache-ul din proces (acelasi obiect Lexer e refolosit), apoi,
+        #daca persistent, incarcam lexerul compilat din cache_dir; altfel il construim si il salvam
+        #directorul (rezolvat, None fara persistent) face parte din cheie: un apel cu alt
+        #director sau cu persistent diferit nu primeste lexerul construit pentru altul
+        if persistent:
+            if cache_dir is None:
+                cache_dir = os.environ.get('LEXER_CACHE_DIR', DEFAULT_CACHE_DIR)
+            cache_dir = os.path.abspath(cache_dir)
+        else:
+            cache_dir = None
+        key = (tuple(tuple(rule) for rule in spec), minimize, cache_dir)
+        return LEXER_CACHE.get_or_build(key, lambda: cls._build_cached(spec, cache_dir, minimize))
+
+    @classmethod
+    def _build_cached(cls, spec: list[tuple[str, str]], cache_dir: str | None, minimize: bool) -> 'Lexer':
+        #cache_dir e None fara cache persistent
+        if cache_dir is None:
+            return cls(spec, minimize=minimize)
+        path = os.path.join(cache_dir, cls.cache_key(spec, minimize) + '.lexc')
+        try:
+            return cls.load(path)
+        except (OSError, ValueError, struct.error):
+            #lipseste sau e corupt: il reconstruim
+            pass
+        lexer = cls(spec, minimize=minimize)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            lexer.save(path)
+        except OSError:
+            #un cache care nu se poate scrie nu e o eroare
+            pass
+        return lexer
+
+    @staticmethod
+    def cache_info() -> dict[str, dict[str, int]]:
+        #contoarele de hit/miss ale cache-urilor din proces
+        return {'ast': AST_CACHE.info(), 'nfa': NFA_CACHE.info(), 'lexer': LEXER_CACHE.info()}
+
+    @staticmethod
+    def clear_caches() -> None:
+        AST_CACHE.clear()
+        NFA_CACHE.clear()
+        LEXER_CACHE.clear()
+
+    def _init_lazy(self, nfa: NFA, cache_size: int) -> None:
+        #tabelul are acelasi format ca in _compile, dar randurile se adauga la cerere;
+        #-2 marcheaza o tranzitie care nu a fost inca calculata
+        alphabet = Alphabet(symbol for symbol in nfa.S if symbol != EPSILON)
+        self._bits = nfa.bitsets(alphabet)
+        self._columns = alphabet.lookup
+        self._ncols = len(alphabet)
+        self._cache_size = max(cache_size, 2)
+        self._table = array('i')
+        self._flushes = 0
+        self._fallback = False
+        self._flush()
+
+    def _flush(self) -> None:
+        #golim cache-ul (pe loc, lex tine o referinta la tabel), ramane doar starea de start
+        del self._table[:]
+        self._masks: list[int] = []
+        self._rows: dict[int, int] = {}
+        self._add_state(self._bits.start)
+
+    def _add_state(self, mask: int) -> int:
+        #adaugam un rand nou pentru starea dfa data de masca de stari nfa
+        row = len(self._table)
+        self._table.extend([-2] * self._ncols)
+        self._table.append(self._accepted_token(self._bits.decode(mask & self._bits.finals)))
+        self._masks.append(mask)
+        self._rows[mask] = row
+        return row
+
+    def _new_lazy_run(self) -> None:
+        #in modul lazy, numaratoarea golirilor de cache incepe de la zero la fiecare apel
+        self._flushes = 0
+        if self._fallback:
+            self._fallback = False
+            self._flush()
+
+    def _fill(self, state: int, col: int) -> int:
+        #calculam tranzitia lipsa din starea (offset-ul) state pe clasa col
+        mask = self._bits.step(self._masks[state // (self._ncols + 1)], col)
+        if self._fallback:
+            return self._simulate(state, mask)
+        if not mask:
+            self._table[state + col] = -1
+            return -1
+        target = self._rows.get(mask)
+        if target is None:
+            if len(self._masks) >= self._cache_size:
+                #cache plin: il golim, iar daca se intampla prea des trecem pe nfa
+                self._flushes += 1
+                self._flush()
+                if self._flushes > self.MAX_CACHE_FLUSHES:
+                    self._fallback = True
+                    self._add_state(0)
+                    self._add_state(0)
+                    return self._simulate(0, mask)
+                #starea curenta nu mai exista in cache, pastram doar tinta
+                return self._add_state(mask)
+            target = self._add_state(mask)
+        self._table[state + col] = target
+        return target
+
+    def _simulate(self, state: int, mask: int) -> int:
+        #simulare nfa: nu memoram tranzitii, starea curenta ocupa pe rand randul 1 sau 2
+        if not mask:
+            return -1
+        stride = self._ncols + 1
+        row = stride if state != stride else 2 * stride
+        self._masks[row // stride] = mask
+        self._table[row + self._ncols] = self._accepted_token(self._bits.decode(mask & self._bits.finals))
+        return row
+
+    def _skipped(self, skip: Iterable[str]) -> frozenset[int]:
+        #indicii tipurilor de tokeni care nu sunt emisi
+        skip = set(skip)
+        return frozenset(i for i, name in enumerate(self.token_names) if name in skip)
+
+    def _error(self, word: str, index: int, max_distance: int) -> str:
+        #mesajul de eroare pentru un token care incepe la index si nu poate fi recunoscut;
+        #linia si coloana se calculeaza doar aici, nu pentru fiecare token
+        line_number = word.count('\n', 0, index)
+        #veficam daca am ajuns la sfarsitul cuvantului
+        if max_distance == len(word):
+            return f"No viable alternative at character EOF, line {line_number}"
+        #daca nu, afisam eroarea cu pozitia exacta, relativa la inceputul liniei
+        colloumn = max_distance - (word.rfind('\n', 0, index) + 1)
+        return f"No viable alternative at character {colloumn}, line {line_number}"
+
+    def _scan(self, word: str, index: int, length: int) -> tuple[int, int, int]:
+        #cel mai lung prefix valid care incepe la index, ca in bucla din lex;
+        #intoarce (token, ultima pozitie finala, pozitia cea mai departata atinsa)
+        table = self._table
+        columns = self._columns
+        ncols = self._ncols
+        current_state = 0
+        last_final_pos = -1
+        best_token = -1
+        max_distance = index
+        for i in range(index, length):
+            col = columns[word[i]]
+            if col < 0:
+                break
+            next_state = table[current_state + col]
+            if next_state < 0:
+                if next_state == -1:
+                    break
+                next_state = self._fill(current_state, col)
+                if next_state < 0:
+                    break
+            current_state = next_state
+            max_distance = i + 1
+            token = table[current_state + ncols]
+            if token >= 0:
+                best_token = token
+                last_final_pos = i
+        return best_token, last_final_pos, max_distance
+
+    def _scan_linear(self, word: str, index: int, length: int, failed: set) -> tuple[int, int, int]:
+        #ca _scan, dar memoreaza in failed perechile (stare, pozitie) din care nu se mai
+        #ajunge intr-o stare finala; o scanare care da peste o astfel de pereche se opreste.
+        #fiecare pereche e parcursa dupa ultima pozitie finala cel mult o data pe tot apelul lex,
+        #deci lexarea e O(n * numarul de stari) in loc de O(n^2)
+        table = self._table
+        columns = self._columns
+        ncols = self._ncols
+        #in modul lazy randurile se refolosesc dupa golirea cache-ului, starea e data de masca
+        lazy = self.lazy
+        stride = ncols + 1
+        size = len(table)
+        current_state = 0
+        last_final_pos = -1
+        best_token = -1
+        max_distance = index
+        visited = []
+        for i in range(index, length):
+            key = (self._masks[current_state // stride], i) if lazy else i * size + current_state
+            if key in failed:
+                break
+            visited.append(key)
+            col = columns[word[i]]
+            if col < 0:
+                break
+            next_state = table[current_state + col]
+            if next_state < 0:
+                if next_state == -1:
+                    break
+                next_state = self._fill(current_state, col)
+                if next_state < 0:
+                    break
+            current_state = next_state
+            max_distance = i + 1
+            token = table[current_state + ncols]
+            if token >= 0:
+                best_token = token
+                last_final_pos = i
+        #dupa ultima pozitie finala nicio pereche vizitata nu mai duce la acceptare
+        failed.update(visited[last_final_pos + 1 - index:] if last_final_pos >= 0 else visited)
+        return best_token, last_final_pos, max_distance
+
+    def _lex_offsets(self, word: str, base: int, complete: bool, compact: bool,
+                     skipped: frozenset[int]) -> tuple[array, array, array, int, list | None, array]:
+        #tokenii lui word, o bucata care incepe la offset-ul base in intrarea completa, ca
+        #offset-uri absolute (tip, start, end), plus pozitia absoluta unde ne-am oprit;
+        #fara compact, si tuplurile (nume, lexem) gata construite. Daca word nu e sfarsitul
+        #intrarii (complete=False) ne oprim la primul token a carui scanare atinge capatul,
+        #pentru ca ar putea continua dincolo de el. Tokenii din skipped nu sunt intorsi, dar
+        #inceputurile tuturor tokenilor (syncs) raman, pentru resincronizare
+        types = array('i')
+        starts = array('q')
+        ends = array('q')
+        syncs = array('q') if skipped else starts
+        pairs = None if compact else []
+        names = self.token_names
+        index = 0
+        length = len(word)
+        while index < length:
+            token, last_final_pos, max_distance = self._scan(word, index, length)
+            if last_final_pos == -1 or (not complete and max_distance == length):
+                break
+            if token in skipped:
+                syncs.append(base + index)
+                index = last_final_pos + 1
+                continue
+            if syncs is not starts:
+                syncs.append(base + index)
+            types.append(token)
+            starts.append(base + index)
+            ends.append(base + last_final_pos + 1)
+            if pairs is not None:
+                pairs.append((names[token], word[index:last_final_pos + 1]))
+            index = last_final_pos + 1
+        return types, starts, ends, base + index, pairs, syncs
+
+    def worker_pool(self, workers: int | None = None) -> ProcessPoolExecutor:
+        #un pool de procese care au deja acest lexer incarcat (tabelul e trimis o singura data
+        #per proces); poate fi refolosit intre apeluri lex_parallel
+        if self.lazy:
+            raise ValueError("A lazy lexer cannot be shared with worker processes")
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.dumps(),))
+
+    def lex_parallel(self, word: str, workers: int | None = None, chunk_size: int = 1 << 20,
+                     executor: ProcessPoolExecutor | None = None, compact: bool = False,
+                     skip: Iterable[str] = ()) -> list[tuple[str, str]] | TokenBuffer:
+        #acelasi rezultat ca lex, dar bucatile intrarii sunt lexate in paralel;
+        #executor trebuie sa fie creat cu worker_pool, altfel se creeaza unul temporar
+        skip = frozenset(skip)
+        length = len(word)
+        if self.lazy or length <= chunk_size:
+            return self.lex(word, compact, skip=skip)
+        if self._stats is not None:
+            self._warn_uncounted('lex_parallel')
+            return self.lex(word, compact, skip=skip)
+        #taiem dupa primul newline de dupa fiecare chunk_size caractere, daca exista unul aproape
+        bounds = [0]
+        while bounds[-1] + chunk_size < length:
+            cut = bounds[-1] + chunk_size
+            newline = word.find('\n', cut, min(length, cut + chunk_size // 4))
+            bounds.append(newline + 1 if newline >= 0 else cut)
+        bounds.append(length)
+        chunks = [word[a:b] for a, b in zip(bounds, bounds[1:])]
+        complete = [False] * (len(chunks) - 1) + [True]
+        skipped = self._skipped(skip)
+        own_executor = executor is None
+        if own_executor:
+            executor = self.worker_pool(workers)
+        try:
+            results = list(executor.map(_lex_chunk, chunks, bounds[:-1], complete,
+                                        [compact] * len(chunks), [skipped] * len(chunks)))
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        #fiecare bucata a fost lexata speculativ de la inceputul ei; tokenii ei sunt corecti
+        #incepand cu primul care porneste dintr-o pozitie la care a ajuns lexarea seriala.
+        #intre ele (la granite sau unde o bucata s-a oprit) lexam serial pe intrarea completa.
+        #workerii intorc offset-uri absolute (si tuplurile, fara compact), deci tokenii unei
+        #bucati se copiaza cu extend pe felii, fara cod python per token
+        tokens = TokenBuffer(word, self.token_names)
+        tokens.skip = skip
+        result = None if compact else []
+        names = self.token_names
+        pos = 0
+        for k, (types, starts, ends, tail, pairs, syncs) in enumerate(results):
+            while pos < bounds[k + 1]:
+                i = bisect_left(syncs, pos)
+                if i < len(syncs) and syncs[i] == pos:
+                    #resincronizare: preluam restul tokenilor emisi ai bucatii
+                    i = bisect_left(starts, pos)
+                    tokens.types.extend(types[i:])
+                    tokens.starts.extend(starts[i:])
+                    tokens.ends.extend(ends[i:])
+                    if result is not None:
+                        result.extend(pairs[i:])
+                    pos = tail
+                    if pos >= bounds[k + 1]:
+                        break
+                token, last_final_pos, max_distance = self._scan(word, pos, length)
+                if last_final_pos == -1:
+                    error = self._error(word, pos, max_distance)
+                    if compact:
+                        tokens.set_error(error)
+                        return tokens
+                    return [("", error)]
+                if token not in skipped:
+                    tokens.append(token, pos, last_final_pos + 1)
+                    if result is not None:
+                        result.append((names[token], word[pos:last_final_pos + 1]))
+                pos = last_final_pos + 1
+        return tokens if compact else result
+
+    def lex_many(self, docs: Iterable[str], compact: bool = False, executor: Executor | None = None,
+                 chunksize: int = 64, ordered: bool = True, linear: bool = False,
+                 skip: Iterable[str] = ()) -> Iterator:
+        #lexeaza o colectie de documente; fara executor, serial, cu tabelele deja compilate;
+        #cu un executor din worker_pool, documentele sunt trimise in loturi de cate chunksize.
+        #ordered=False produce perechi (index, rezultat) in ordinea terminarii loturilor
+        #skip poate fi un iterator: il citim o singura data, nu la fiecare document
+        skip = frozenset(skip)
+        if executor is not None and self._stats is not None:
+            self._warn_uncounted('lex_many')
+            executor = None
+        if executor is None:
+            lex = self.lex
+            for index, doc in enumerate(docs):
+                yield lex(doc, compact, linear, skip) if ordered else (index, lex(doc, compact, linear, skip))
+            return
+        yield from map_batches(executor, _lex_batch, docs, chunksize, ordered, compact, linear, tuple(skip))
+
+    def relex(self, previous: TokenBuffer, offset: int, deleted: int, inserted: str) -> TokenEdit:
+        #re-lexare dupa editarea lui previous.source (rezultatul lui lex cu compact=True):
+        #se sterg deleted caractere de la offset si se insereaza inserted. Lexam doar de la primul
+        #token a carui scanare a citit zona editata si ne oprim cand dam de un token vechi,
+        #de dupa editare, care incepe in acelasi loc (deplasat): de acolo rezultatul e identic.
+        #tokenii ignorati la lexarea lui previous (skip) sunt ignorati si aici; cu statistici,
+        #apelul numara doar caracterele re-lexate
+        old = previous.source
+        text = old[:offset] + inserted + old[offset + deleted:]
+        delta = len(inserted) - deleted
+        line_delta = inserted.count('\n') - old.count('\n', offset, offset + deleted)
+        skip = previous.skip
+        if previous.error is not None or not len(previous):
+            return TokenEdit(text, 0, len(previous), self.lex(text, compact=True, skip=skip), delta, line_delta)
+        if self.lazy:
+            self._new_lazy_run()
+        #lex nu calculeaza reaches; il calculam la prima re-lexare a unui buffer, iar
+        #apply il pastreaza pentru urmatoarele
+        if previous.reaches is None:
+            previous.reaches = self._reaches(previous)
+        #primul token afectat: reaches e crescator, deci il gasim prin cautare binara; reluam
+        #de la sfarsitul tokenului dinainte, ca sa relexam si tokenii ignorati dintre ei
+        first = bisect_left(previous.reaches, offset)
+        pos = previous.ends[first - 1] if first > 0 else 0
+        reach = previous.reaches[first - 1] if first > 0 else 0
+        skipped = self._skipped(skip)
+        tokens = TokenBuffer(text, self.token_names)
+        tokens.skip = skip
+        tokens.reaches = array('q')
+        #pozitiile liniilor se actualizeaza din cele vechi, fara sa reparcurgem textul
+        tokens._line_index = previous.line_index.edited(text, offset, deleted, inserted)
+        length = len(text)
+        edit_end = offset + len(inserted)
+        resync = len(previous)
+        stats = self._stats
+        names = self.token_names
+        relex_start = pos
+        while pos < length:
+            if pos >= edit_end:
+                #token vechi care incepe in acelasi loc, in afara zonei editate?
+                j = bisect_left(previous.starts, pos - delta)
+                if j < len(previous) and previous.starts[j] == pos - delta and pos - delta >= offset + deleted:
+                    resync = j
+                    break
+            token, last_final_pos, max_distance = self._scan(text, pos, length)
             if last_final_pos == -1:
-                #veficam daca am ajuns la sfarsitul cuvantului
-                if max_distance == len(word):
-                    return [("", f"No viable alternative at character EOF, line {line_number}")]
+                #eroarea e raportata ca de lex pe tot textul nou (un apel numarat separat)
+                if self._start_counting(pos - relex_start) is not None:
+                    stats.chars_scanned += max_distance - pos
+                    self._stop_counting()
+                return TokenEdit(text, 0, len(previous), self.lex(text, compact=True, skip=skip), delta,
+                                 line_delta)
+            if stats is not None:
+                stats.count_token(names[token], pos, last_final_pos + 1, max_distance)
+            reach = max(reach, max_distance)
+            if token not in skipped:
+                tokens.append(token, pos, last_final_pos + 1)
+                tokens.reaches.append(reach)
+            pos = last_final_pos + 1
+        if self._start_counting(pos - relex_start) is not None:
+            self._stop_counting()
+        return TokenEdit(text, first, resync - first, tokens, delta, line_delta)
+
+    def _reaches(self, tokens: TokenBuffer) -> array:
+        #pentru fiecare token din tokens, cat de departe a citit scanarea pana la el inclusiv;
+        #refacem scanarea lui tokens.source (fara eroare), cu aceiasi tokeni ignorati
+        skipped = self._skipped(tokens.skip)
+        source = tokens.source
+        reaches = array('q')
+        length = len(source)
+        index = 0
+        reach = 0
+        while index < length:
+            token, last_final_pos, max_distance = self._scan(source, index, length)
+            reach = max(reach, max_distance)
+            if token not in skipped:
+                reaches.append(reach)
+            index = last_final_pos + 1
+        return reaches
+
+    def lex_stream(self, source: IO[str] | Iterable[str], chunk_size: int = 1 << 16,
+                   skip: Iterable[str] = ()) -> Iterator[tuple[str, str]]:
+        #varianta generator a lui lex: citeste intrarea pe bucati dintr-un fisier
+        #(orice obiect cu read) sau dintr-un iterabil de siruri si produce tokenii pe masura
+        #ce ii gaseste; in buffer ramane doar lexemul curent si ce a fost citit dupa el.
+        #tokenii din skip nu sunt produsi
+        if hasattr(source, 'read'):
+            chunks = iter(lambda: source.read(chunk_size), '')
+        else:
+            chunks = iter(source)
+        buffer = ''
+        index = 0
+        #offset-ul absolut al inceputului buffer-ului in intrare
+        offset = 0
+        eof = False
+        line_number = 0
+        line_start_index = 0
+        names = self.token_names
+        skipped = self._skipped(skip)
+        if self.lazy:
+            self._new_lazy_run()
+        #cu statistici, caracterele sunt numarate pe masura ce bucatile sunt citite, iar
+        #hook-ul e apelat la sfarsitul intrarii sau la eroare
+        stats = self._start_counting(0)
+        while True:
+            if index >= len(buffer):
+                #am consumat tot buffer-ul, citim bucata urmatoare
+                chunk = next(chunks, None)
+                if chunk is None:
+                    if stats is not None:
+                        self._stop_counting()
+                    return
+                if stats is not None:
+                    stats.chars += len(chunk)
+                buffer = chunk
+                offset += index
+                index = 0
+                continue
+            token, last_final_pos, max_distance = self._scan(buffer, index, len(buffer))
+            if max_distance == len(buffer) and not eof:
+                #scanarea a ajuns la capatul buffer-ului, lexemul poate continua in
+                #bucata urmatoare: aruncam ce am consumat, citim si reluam de la index
+                chunk = next(chunks, None)
+                if chunk is None:
+                    eof = True
                 else:
-                    #daca nu,, afisam eroarea cu pozitia exacta
-                    colloumn = max_distance - line_start_index
-                    return [("", f"No viable alternative at character {colloumn}, line {line_number}")]
+                    if stats is not None:
+                        stats.chars += len(chunk)
+                    buffer = buffer[index:] + chunk
+                    offset += index
+                    index = 0
+                continue
 
-            #lexemul gasit de la index la last_final_pos
-            lexem = word[index:last_final_pos + 1]
-            result.append((best_token, lexem))
+            #gestionam erorile; tokenii gasiti pana aici au fost deja produsi
+            if last_final_pos == -1:
+                if stats is not None:
+                    stats.chars_scanned += max_distance - index
+                if max_distance == len(buffer):
+                    yield "", f"No viable alternative at character EOF, line {line_number}"
+                else:
+                    colloumn = offset + max_distance - line_start_index
+                    yield "", f"No viable alternative at character {colloumn}, line {line_number}"
+                if stats is not None:
+                    self._stop_counting()
+                return
 
-            #actualizam numarul liniei si indexul de start al liniei
-            #doar daca lexemul accontine caractere de newline
-            newlines_count = lexem.count('\n')
+            if stats is not None:
+                stats.count_token(names[token], index, last_final_pos + 1, max_distance)
+            newlines_count = buffer.count('\n', index, last_final_pos + 1)
+            if token not in skipped:
+                yield names[token], buffer[index:last_final_pos + 1]
             if newlines_count > 0:
                 line_number += newlines_count
-                #actualizam indexul de start al liniei
-                line_start_index = index + lexem.rfind('\n') + 1
+                line_start_index = offset + buffer.rfind('\n', index, last_final_pos + 1) + 1
+            index = last_final_pos + 1
+
+    def _lex_counted(self, word: str, compact: bool, linear: bool,
+                     skip: frozenset[str]) -> list[tuple[str, str]] | TokenBuffer:
+        #acelasi rezultat ca lex, token cu token prin _scan, actualizand contoarele din stats
+        stats = self._start_counting(len(word))
+        result = []
+        tokens = TokenBuffer(word, self.token_names) if compact else None
+        if tokens is not None:
+            tokens.skip = skip
+        skipped = self._skipped(skip)
+        failed = set() if linear else None
+        names = self.token_names
+        length = len(word)
+        index = 0
+        if self.lazy:
+            self._new_lazy_run()
+        while index < length:
+            if failed is not None:
+                token, last_final_pos, max_distance = self._scan_linear(word, index, length, failed)
+            else:
+                token, last_final_pos, max_distance = self._scan(word, index, length)
+            if last_final_pos == -1:
+                if failed is not None:
+                    max_distance = self._scan(word, index, length)[2]
+                stats.chars_scanned += max_distance - index
+                error = self._error(word, index, max_distance)
+                if tokens is not None:
+                    tokens.set_error(error)
+                    result = tokens
+                else:
+                    result = [("", error)]
+                break
+            stats.count_token(names[token], index, last_final_pos + 1, max_distance)
+            if token in skipped:
+                pass
+            elif tokens is None:
+                result.append((names[token], word[index:last_final_pos + 1]))
+            else:
+                tokens.append(token, index, last_final_pos + 1)
+            index = last_final_pos + 1
+        else:
+            if tokens is not None:
+                result = tokens
+        self._stop_counting()
+        return result
+
+    def lex(self, word: str, compact: bool = False, linear: bool = False,
+            skip: Iterable[str] = ()) -> list[tuple[str, str]] | TokenBuffer:
+        #cu compact=True rezultatul e un TokenBuffer (coloane de intregi, fara lexeme)
+        #cu linear=True timpul e garantat liniar (vezi _scan_linear), util pe intrari nesigure
+        #tokenii cu tipurile din skip (de exemplu spatiile) sunt recunoscuti, dar nu sunt emisi;
+        #skip e citit o singura data (poate fi un generator)
+        skip = frozenset(skip)
+        if self._stats is not None:
+            #varianta cu contoare; fara statistici bucla de mai jos ramane neschimbata
+            return self._lex_counted(word, compact, linear, skip)
+        #initializam variabilele necesare
+        result = []
+        tokens = None
+        if compact:
+            tokens = TokenBuffer(word, self.token_names)
+            tokens.skip = skip
+            #legam local metodele append ale coloanelor
+            add_type = tokens.types.append
+            add_start = tokens.starts.append
+            add_end = tokens.ends.append
+        skipped = self._skipped(skip)
+        index = 0
+        length = len(word)
+        if self.lazy:
+            self._new_lazy_run()
+        #legam tabelele local pentru bucla principala
+        table = self._table
+        columns = self._columns
+        ncols = self._ncols
+        names = self.token_names
+        #perechile (stare, pozitie) fara continuare acceptata, doar in modul liniar
+        failed = set() if linear else None
+        #parcurgem sirul de intrare
+        while index < length:
+            if failed is not None:
+                best_token, last_final_pos, max_distance = self._scan_linear(word, index, length, failed)
+                if last_final_pos == -1:
+                    #pentru mesajul de eroare refacem scanarea completa (o singura data)
+                    max_distance = self._scan(word, index, length)[2]
+            else:
+                current_state = 0
+                last_final_pos = -1
+                best_token = -1
+                #punctul cel mai departat de inceputul liniei la care ajungem
+                max_distance = index
+                #incercam sa gasim cel mai lung prefix valid
+                for i in range(index, length):
+                    #clasa simbolului curent, daca nu apare in specificatie iesim din bucla
+                    col = columns[word[i]]
+                    if col < 0:
+                        break
+                    #starea urmatoare, -1 inseamna synk state
+                    next_state = table[current_state + col]
+                    if next_state < 0:
+                        #-2: tranzitie inca necalculata (doar in modul lazy)
+                        if next_state == -1:
+                            break
+                        next_state = self._fill(current_state, col)
+                        if next_state < 0:
+                            break
+                    current_state = next_state
+                    #actualizam pozitia cea mai departata
+                    max_distance = i + 1
+                    #token-ul acceptat de starea curenta, precalculat dupa prioritate
+                    token = table[current_state + ncols]
+                    if token >= 0:
+                        best_token = token
+                        last_final_pos = i
+
+            #gestionam erorile
+            if last_final_pos == -1:
+                error = self._error(word, index, max_distance)
+                if tokens is not None:
+                    tokens.set_error(error)
+                    return tokens
+                return [("", error)]
+
+            if best_token in skipped:
+                #token ignorat: nu construim nici lexemul, nici tuplul
+                pass
+            elif tokens is None:
+                #lexemul gasit de la index la last_final_pos
+                result.append((names[best_token], word[index:last_final_pos + 1]))
+            else:
+                add_type(best_token)
+                add_start(index)
+                add_end(last_final_pos + 1)
 
             index = last_final_pos + 1
 
-        return result
\ No newline at end of file
+        return result if tokens is None else tokens
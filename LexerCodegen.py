@@ -0,0 +1,147 @@
+# generarea unui modul python de sine statator dintr-un lexer: tabelul dfa compilat si
+# alfabetul sunt scrise ca literali, iar modulul generat nu importa nimic din acest pachet
+#   python -m <pachet>.LexerCodegen spec.json -o my_lexer.py [--minimize]
+# unde <pachet> e numele sub care e importat acest pachet
+# spec.json contine lista regulilor, ca perechi [nume, regex], in ordinea prioritatii
+import argparse
+import json
+import sys
+
+from . import __version__
+from .Lexer import Lexer, _write_atomic
+
+# codul comun tuturor modulelor generate; @NAME@ se inlocuieste cu literalii lexer-ului
+TEMPLATE = '''\
+# generat de @GENERATOR@ @VERSION@ (cheie @KEY@), nu modificati manual
+# lex(word, skip=()) intoarce aceleasi tupluri (nume, lexem) ca Lexer.lex din pachet
+from bisect import bisect_right
+
+TOKEN_NAMES = @NAMES@
+SPEC = @SPEC@
+
+# randul unei stari incepe la offset-ul ei (numarul starii * @STRIDE@); coloanele sunt
+# clasele de caractere, ultima coloana e token-ul acceptat (-1: niciunul), -1 e sink state-ul
+_NCOLS = @NCOLS@
+_TABLE = (
+@TABLE@
+)
+# intervalul k de coduri [_BOUNDS[k], _BOUNDS[k + 1]) are clasa _INTERVAL_CLASS[k]
+_BOUNDS = @BOUNDS@
+_INTERVAL_CLASS = @INTERVAL_CLASS@
+
+
+class _Columns(dict):
+    # cache caracter -> clasa, completat la prima aparitie a caracterului
+    def __missing__(self, char):
+        cls = _INTERVAL_CLASS[bisect_right(_BOUNDS, ord(char)) - 1]
+        self[char] = cls
+        return cls
+
+
+_COLUMNS = _Columns()
+for _code in range(128):
+    _COLUMNS[chr(_code)]
+del _code
+
+
+def _error(word, index, max_distance):
+    line_number = word.count('\\n', 0, index)
+    if max_distance == len(word):
+        return f"No viable alternative at character EOF, line {line_number}"
+    colloumn = max_distance - (word.rfind('\\n', 0, index) + 1)
+    return f"No viable alternative at character {colloumn}, line {line_number}"
+
+
+def lex(word, skip=()):
+    skip = set(skip)
+    skipped = frozenset(i for i, name in enumerate(TOKEN_NAMES) if name in skip)
+    table = _TABLE
+    columns = _COLUMNS
+    ncols = _NCOLS
+    names = TOKEN_NAMES
+    result = []
+    append = result.append
+    index = 0
+    length = len(word)
+    while index < length:
+        current_state = 0
+        last_final_pos = -1
+        best_token = -1
+        max_distance = index
+        for i in range(index, length):
+            col = columns[word[i]]
+            if col < 0:
+                break
+            current_state = table[current_state + col]
+            if current_state < 0:
+                break
+            max_distance = i + 1
+            token = table[current_state + ncols]
+            if token >= 0:
+                best_token = token
+                last_final_pos = i
+        if last_final_pos == -1:
+            return [("", _error(word, index, max_distance))]
+        if best_token not in skipped:
+            append((names[best_token], word[index:last_final_pos + 1]))
+        index = last_final_pos + 1
+    return result
+'''
+
+
+def generate_lexer_module(lexer: Lexer) -> str:
+    # sursa modulului generat; prioritatile tokenilor sunt deja rezolvate in tabel
+    # (ultima coloana a fiecarei stari), deci modulul doar interpreteaza tabelul
+    if lexer.lazy:
+        raise ValueError("A lazy lexer has no compiled table to generate code from")
+    stride = lexer._ncols + 1
+    table = lexer._table
+    #un rand al tabelului pe linie
+    rows = "\n".join("    " + ", ".join(map(str, table[row:row + stride])) + ","
+                     for row in range(0, len(table), stride))
+    values = {
+        'GENERATOR': __spec__.name,
+        'VERSION': __version__,
+        'KEY': Lexer.cache_key(lexer.spec)[:16],
+        'NAMES': repr(tuple(lexer.token_names)),
+        'SPEC': repr(tuple(tuple(rule) for rule in lexer.spec)),
+        'STRIDE': str(stride),
+        'NCOLS': str(lexer._ncols),
+        'TABLE': rows,
+        'BOUNDS': repr(tuple(lexer._alphabet.bounds)),
+        'INTERVAL_CLASS': repr(tuple(lexer._alphabet.interval_class)),
+    }
+    source = TEMPLATE
+    for name, value in values.items():
+        source = source.replace(f"@{name}@", value)
+    return source
+
+
+def write_lexer_module(lexer: Lexer, path: str) -> None:
+    # scris atomic, ca Lexer.save
+    _write_atomic(path, generate_lexer_module(lexer).encode('utf-8'))
+
+
+def main(argv: list[str] | None = None) -> int:
+    #numele modulului e cel sub care a fost importat, nu unul fixat aici
+    parser = argparse.ArgumentParser(prog=f'python -m {__spec__.name}',
+                                     description='Generate a standalone lexer module from a spec.')
+    parser.add_argument('spec', help='JSON file with the rules, a list of [name, regex] pairs')
+    parser.add_argument('-o', '--output', help='write the module to this file (default: stdout)')
+    parser.add_argument('--minimize', action='store_true', help='minimize the DFA before generating')
+    args = parser.parse_args(argv)
+
+    with open(args.spec, encoding='utf-8') as f:
+        rules = json.load(f)
+    if not isinstance(rules, list) or not all(isinstance(rule, list) and len(rule) == 2 for rule in rules):
+        raise ValueError("The spec must be a list of [name, regex] pairs")
+    lexer = Lexer([(name, regex) for name, regex in rules], minimize=args.minimize)
+    if args.output:
+        write_lexer_module(lexer, args.output)
+    else:
+        sys.stdout.write(generate_lexer_module(lexer))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
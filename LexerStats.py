@@ -0,0 +1,87 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from collections.abc import Iterator
+
+
+@dataclass
+class RuleStats:
+    # dimensiunile automatelor unei reguli din specificatie, luata separat
+    name: str
+    nfa_states: int
+    nfa_transitions: int
+    dfa_states: int
+    dfa_transitions: int
+
+
+class LexerStats:
+    # statistici colectate de un Lexer creat cu stats=True (sau dupa enable_stats):
+    # timpii fazelor constructiei, dimensiunile automatelor si contoare de lexare.
+    # cand statisticile sunt dezactivate lexer-ul nu creeaza acest obiect deloc
+    def __init__(self) -> None:
+        # secunde per faza a constructiei: regex_parse, optimize, thompson, remap, combine,
+        # subset_construction, minimize, compile (acumulate peste reguli)
+        self.phases: dict[str, float] = {}
+        self.rules: list[RuleStats] = []
+        # automatele lexer-ului complet
+        self.nfa_states = 0
+        self.dfa_states = 0
+        # contoarele lexarii (lex, lex_stream, relex, lex_bytes): caractere din intrare, caractere
+        # citite de scanari (inclusiv cele citite din nou dupa ce scanarea a trecut de sfarsitul
+        # tokenului acceptat)
+        self.lex_calls = 0
+        self.chars = 0
+        self.chars_scanned = 0
+        self.chars_rescanned = 0
+        self.tokens: Counter[str] = Counter()
+        self.longest_lexeme = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def merge_build(self, other: 'LexerStats') -> None:
+        # adauga timpii fazelor si regulile masurate separat (de exemplu intr-un worker)
+        for name, seconds in other.phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.rules.extend(other.rules)
+
+    def count_token(self, name: str, start: int, end: int, reach: int) -> None:
+        # un token source[start:end]; scanarea lui a citit pana la reach, iar caracterele de
+        # dupa end vor fi citite din nou de scanarea urmatoare
+        self.chars_scanned += reach - start
+        self.chars_rescanned += reach - end
+        if end - start > self.longest_lexeme:
+            self.longest_lexeme = end - start
+        self.tokens[name] += 1
+
+    def reset_lex_counters(self) -> None:
+        self.lex_calls = 0
+        self.chars = 0
+        self.chars_scanned = 0
+        self.chars_rescanned = 0
+        self.tokens = Counter()
+        self.longest_lexeme = 0
+
+    def as_dict(self) -> dict:
+        return {
+            'phases': dict(self.phases),
+            'rules': [vars(rule) for rule in self.rules],
+            'nfa_states': self.nfa_states,
+            'dfa_states': self.dfa_states,
+            'lex_calls': self.lex_calls,
+            'chars': self.chars,
+            'chars_scanned': self.chars_scanned,
+            'chars_rescanned': self.chars_rescanned,
+            'tokens': dict(self.tokens),
+            'longest_lexeme': self.longest_lexeme,
+        }
+
+    def __repr__(self) -> str:
+        return (f"LexerStats(rules={len(self.rules)}, dfa_states={self.dfa_states}, "
+                f"lex_calls={self.lex_calls}, tokens={sum(self.tokens.values())})")
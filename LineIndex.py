@@ -0,0 +1,52 @@
+from array import array
+from bisect import bisect_right
+
+
+class LineIndex:
+    # offset-urile la care incep liniile unui text, calculate intr-o singura trecere;
+    # linia si coloana unui offset se afla prin cautare binara, in O(log n)
+    # liniile si coloanele sunt numerotate de la 0, ca in mesajele de eroare ale lui lex
+    def __init__(self, source: str, starts: array | None = None) -> None:
+        self.source = source
+        if starts is not None:
+            self.starts = starts
+            return
+        starts = array('q', [0])
+        find = source.find
+        newline = find('\n')
+        while newline >= 0:
+            starts.append(newline + 1)
+            newline = find('\n', newline + 1)
+        self.starts = starts
+
+    def edited(self, source: str, offset: int, deleted: int, inserted: str) -> 'LineIndex':
+        # indexul lui source, textul obtinut prin stergerea a deleted caractere de la offset si
+        # inserarea lui inserted; parcurgem doar inserted, restul liniilor sunt copiate
+        # (cele de dupa editare deplasate)
+        starts = self.starts
+        # liniile care incep in (offset, offset + deleted] au newline-ul in zona stearsa
+        first = bisect_right(starts, offset)
+        stop = bisect_right(starts, offset + deleted)
+        added = array('q')
+        newline = inserted.find('\n')
+        while newline >= 0:
+            added.append(offset + newline + 1)
+            newline = inserted.find('\n', newline + 1)
+        shift = (len(inserted) - deleted).__add__
+        return LineIndex(source, starts[:first] + added + array('q', map(shift, starts[stop:])))
+
+    def line(self, offset: int) -> int:
+        return bisect_right(self.starts, offset) - 1
+
+    def column(self, offset: int) -> int:
+        return offset - self.starts[self.line(offset)]
+
+    def position(self, offset: int) -> tuple[int, int]:
+        line = self.line(offset)
+        return line, offset - self.starts[line]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __repr__(self) -> str:
+        return f"LineIndex({len(self)} lines)"
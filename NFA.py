@@ -1,4 +1,5 @@
 from .DFA import DFA
+from .CharSet import Alphabet, CharSet
 
 from dataclasses import dataclass
 from collections.abc import Callable
@@ -8,10 +9,10 @@ EPSILON = ''  # this is how epsilon is represented by the checker in the transit
 
 @dataclass
 class NFA[STATE]:
-    S: set[str]
+    S: set[str | CharSet]
     K: set[STATE]
     q0: STATE
-    d: dict[tuple[STATE, str], set[STATE]]
+    d: dict[tuple[STATE, str | CharSet], set[STATE]]
     F: set[STATE]
 
     def epsilon_closure(self, state: STATE) -> set[STATE]:
@@ -33,50 +34,74 @@ class NFA[STATE]:
         #returnam inchiderea
         return closure
 
+    def bitsets(self, alphabet: Alphabet) -> 'NFABitsets[STATE]':
+        # internam starile nfa ca int-uri, o multime de stari devine o masca de biti
+        states = list(self.K)
+        index = {state: i for i, state in enumerate(states)}
+        for (state, _), targets in self.d.items():
+            for s in (state, *targets):
+                if s not in index:
+                    index[s] = len(states)
+                    states.append(s)
+        # inchiderea epsilon a fiecarei stari, calculata o singura data
+        closures = [0] * len(states)
+        for i, state in enumerate(states):
+            mask = 0
+            for s in self.epsilon_closure(state):
+                mask |= 1 << index[s]
+            closures[i] = mask
+        # pasii: pentru fiecare stare, clasa -> inchiderea starilor in care ajungem
+        steps: list[dict[int, int]] = [{} for _ in states]
+        for (state, symbol), targets in self.d.items():
+            if symbol == EPSILON:
+                continue
+            mask = 0
+            for t in targets:
+                mask |= closures[index[t]]
+            row = steps[index[state]]
+            for cls in alphabet.symbol_classes[symbol]:
+                row[cls] = row.get(cls, 0) | mask
+        finals = 0
+        for f in self.F:
+            if f in index:
+                finals |= 1 << index[f]
+        return NFABitsets(states, closures[index[self.q0]], steps, finals)
+
     def subset_construction(self) -> DFA[frozenset[STATE]]:
-        epsilon = self.epsilon_closure(self.q0)
-        # starea initiala dfa = epsilon closure din q0 nfa
-        start_states = frozenset(epsilon)
-        # multimea starilor dfa (fiecare e un frozenset de stari nfa)
-        dfa_states = {start_states}
-        # tranzitii dfa: (stare_dfa, simbol) -> stare_dfa
-        dfa_trans: dict[tuple[frozenset[STATE], str], frozenset[STATE]] = {}
+        # impartim alfabetul in clase de echivalenta, dfa-ul are tranzitii pe clase
+        alphabet = Alphabet(symbol for symbol in self.S if symbol != EPSILON)
+        n_classes = len(alphabet)
+        bits = self.bitsets(alphabet)
+        # starile dfa se construiesc ca masti, la final devin frozenset-uri
+        start_mask = bits.start
+        # tranzitii dfa pe masti: (masca, clasa) -> masca
+        mask_trans: dict[tuple[int, int], int] = {}
         # stari care asteapta procesare
-        unprocessed = [start_states]
-        # stari finale dfa = orice contine o stare finala nfa
-        dfa_final_states = set()
-        if self.F.intersection(start_states):
-            dfa_final_states.add(start_states)
+        seen = {start_mask}
+        unprocessed = [start_mask]
         while unprocessed:
             current = unprocessed.pop()
-            # pentru fiecare simbol din alfabet, fara epsilon
-            for elem in self.S:
-                if elem == EPSILON:
-                    continue
-                # move: stari nfa accesibile pe elem
-                next_states = set()
-                for state in current:
-                    next_states.update(self.d.get((state, elem), set()))
-                # aplicam epsilon closure pe next_states
-                closure = set()
-                for s in next_states:
-                    closure.update(self.epsilon_closure(s))
-                # forma finala a noii stari dfa
-                next_frozen = frozenset(closure)
+            # move + epsilon closure pentru toate clasele dintr-o trecere
+            targets = bits.move(current)
+            for elem in range(n_classes):
+                next_mask = targets.get(elem, 0)
                 # inregistram tranzitia
-                dfa_trans[(current, elem)] = next_frozen
+                mask_trans[(current, elem)] = next_mask
                 # daca e stare noua dfa, o adaugam
-                if next_frozen not in dfa_states:
-                    #1
-                    unprocessed.append(next_frozen)
-                    #2
-                    dfa_states.add(next_frozen)
-                    #3
-                    if next_frozen.intersection(self.F):
-                    #4
-                        dfa_final_states.add(next_frozen)
+                if next_mask not in seen:
+                    seen.add(next_mask)
+                    unprocessed.append(next_mask)
+        # traducem mastile in multimi de stari nfa
+        frozen = {mask: frozenset(bits.decode(mask)) for mask in seen}
+        dfa_states = set(frozen.values())
+        dfa_trans: dict[tuple[frozenset[STATE], int], frozenset[STATE]] = {}
+        for (mask, elem), next_mask in mask_trans.items():
+            dfa_trans[(frozen[mask], elem)] = frozen[next_mask]
+        # stari finale dfa = orice contine o stare finala nfa
+        dfa_final_states = {frozen[mask] for mask in seen if mask & bits.finals}
         # returnam dfa complet
-        return DFA(self.S, dfa_states, start_states, dfa_trans, dfa_final_states)
+        return DFA(set(range(n_classes)), dfa_states, frozen[start_mask], dfa_trans, dfa_final_states,
+                   alphabet)
 
     def remap_states[OTHER_STATE](self, f: 'Callable[[STATE], OTHER_STATE]') -> 'NFA[OTHER_STATE]':
         #multimea starilor
@@ -98,3 +123,42 @@ class NFA[STATE]:
             d[(f(state), char)] = new_targets
 
         return NFA(self.S, k, q0, d, F)
+
+
+@dataclass
+class NFABitsets[STATE]:
+    # nfa cu stari internate: bitul i reprezinta starea states[i]
+    states: list[STATE]
+    start: int
+    steps: list[dict[int, int]]
+    finals: int
+
+    def move(self, mask: int) -> dict[int, int]:
+        # starile (inchise epsilon) in care ajungem din masca, pentru fiecare clasa
+        targets: dict[int, int] = {}
+        steps = self.steps
+        while mask:
+            low = mask & -mask
+            for cls, step in steps[low.bit_length() - 1].items():
+                targets[cls] = targets.get(cls, 0) | step
+            mask ^= low
+        return targets
+
+    def step(self, mask: int, cls: int) -> int:
+        # starile (inchise epsilon) in care ajungem din masca pe o singura clasa
+        result = 0
+        steps = self.steps
+        while mask:
+            low = mask & -mask
+            result |= steps[low.bit_length() - 1].get(cls, 0)
+            mask ^= low
+        return result
+
+    def decode(self, mask: int) -> list[STATE]:
+        # starile nfa din masca
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self.states[low.bit_length() - 1])
+            mask ^= low
+        return result
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+try:
+    import numpy as np
+except ImportError:  # numpy e optional, doar pentru acest backend
+    np = None
+
+from .ParseTree import ParseTree
+
+
+class NumpyCYK:
+    # CYK vectorizat: randul j al tabelului e o matrice booleana (pozitie de start x neterminal),
+    # iar la fiecare lungime j aplicam toate regulile binare, pe toate impartirile k si pe toate
+    # pozitiile de start odata. Tabelul ocupa de doua ori (n + 1)^2 * neterminali octeti.
+    # Arborele se reconstruieste la sfarsit, de sus in jos, in aceeasi ordine ca in cykParse
+    # (k crescator, apoi perechile (Y, Z) in ordinea numerelor), deci rezultatul e acelasi
+    # cate elemente are cel mult tabelul intermediar (k x pozitie x regula) al unui pas
+    BLOCK = 1 << 22
+
+    def __init__(self, names: list[str], unit: dict[str, int], binary: dict[int, dict[int, int]]) -> None:
+        if np is None:
+            raise ImportError("The numpy CYK backend needs numpy")
+        self.names = names
+        count = len(names)
+        #terminal -> vectorul boolean al neterminalilor X cu X -> terminal
+        self.unit = {token: np.array([mask >> x & 1 for x in range(count)], dtype=bool)
+                     for token, mask in unit.items()}
+        #regulile binare X -> Y Z, sortate dupa (Y, Z)
+        rules = sorted((y, z, x) for y, pairs in binary.items() for z, heads in pairs.items()
+                       for x in range(count) if heads >> x & 1)
+        self.left = np.array([y for y, _, _ in rules], dtype=np.intp)
+        self.right = np.array([z for _, z, _ in rules], dtype=np.intp)
+        #matricea regula -> cap, ca sa adunam rezultatele regulilor pe neterminali
+        self.heads = np.zeros((len(rules), count), dtype=np.float32)
+        for r, (_, _, x) in enumerate(rules):
+            self.heads[r, x] = 1
+        #pentru reconstructie: regulile fiecarui cap, in aceeasi ordine
+        self.rules_of = [np.array([r for r, rule in enumerate(rules) if rule[2] == x], dtype=np.intp)
+                         for x in range(count)]
+
+    def parse(self, types: list[str], lexeme: Callable[[int], str], start_symbol: str) -> ParseTree | None:
+        length = len(types)
+        count = len(self.names)
+        if start_symbol not in self.names or length == 0:
+            return None
+        start = self.names.index(start_symbol)
+        #by_start[j, i, x]: neterminalul x genereaza subcuvantul de lungime j de la pozitia i;
+        #by_end[j, e, x] e acelasi lucru pentru subcuvantul care se termina la e. Pentru un j dat,
+        #partile stangi (toate k) si cele drepte sunt atunci felii, fara copieri pe indici
+        by_start = np.zeros((length + 1, length, count), dtype=bool)
+        by_end = np.zeros((length + 1, length + 1, count), dtype=bool)
+        empty = np.zeros(count, dtype=bool)
+        by_start[1] = [self.unit.get(token, empty) for token in types]
+        by_end[1, 1:] = by_start[1]
+        left, right = self.left, self.right
+        for j in range(2, length + 1):
+            starts = length - j + 1
+            fired = np.zeros((starts, len(left)), dtype=bool)
+            #impartim k-urile in blocuri, ca tabelul intermediar sa ramana mic
+            block = max(1, self.BLOCK // max(1, starts * len(left)))
+            for k in range(1, j, block):
+                stop = min(j, k + block)
+                #stanga: lungimi k..stop-1 de la i; dreapta: lungimi j-k..j-stop+1 pana la i+j
+                lefts = by_start[k:stop, :starts][..., left]
+                rights = by_end[j - k:j - stop:-1, j:][..., right]
+                fired |= (lefts & rights).any(axis=0)
+            by_start[j, :starts] = fired.astype(np.float32) @ self.heads > 0
+            by_end[j, j:] = by_start[j, :starts]
+
+        #verificam simbolul de start
+        if not by_start[length, 0, start]:
+            return None
+        if length == 1:
+            return ParseTree(self.names[start], (types[0], lexeme(0)))
+        root = ParseTree(self.names[start])
+        stack = [(root, length, 0, start)]
+        while stack:
+            tree, j, i, x = stack.pop()
+            rules = self.rules_of[x]
+            for k in range(1, j):
+                matches = by_start[k, i, left[rules]] & by_start[j - k, i + k, right[rules]]
+                if matches.any():
+                    rule = rules[matches.argmax()]
+                    break
+            y, z = left[rule], right[rule]
+            for child_length, child_start, child in ((k, i, y), (j - k, i + k, z)):
+                name = self.names[child]
+                if child_length == 1:
+                    tree.add_children(ParseTree(name, (types[child_start], lexeme(child_start))))
+                else:
+                    subtree = ParseTree(name)
+                    tree.add_children(subtree)
+                    stack.append((subtree, child_length, child_start, child))
+        return root
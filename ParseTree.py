@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+from typing import IO
+
 class ParseTree:
+    __slots__ = ('name', 'children', 'token')
 
     def __init__(self, name:str, token: tuple[str, str] = None):
         self.name: str = name
@@ -9,27 +13,35 @@ class ParseTree:
 
     def add_children(self, child: ParseTree):
         self.children.append(child)
-    
-    def to_string(self, indent=0):
-        pad = "  " * indent  
-        if self.token:
-            # Nod terminal
-            s = f"{pad}({self.token[0]}: {self.token[1]})"
-        else:
-            # Nod cu regula intermediara
-            if self.name.startswith("int_"):
-                s = ""
-                for child in self.children:
-                    s += "\n" + child.to_string(indent)
-                s = s[1:]
+
+    def lines(self, indent=0) -> Iterator[str]:
+        # liniile reprezentarii, in preordine, cu o stiva explicita in loc de recursivitate
+        stack = [(self, indent)]
+        while stack:
+            node, level = stack.pop()
+            if node.token:
+                # Nod terminal
+                yield f"{'  ' * level}({node.token[0]}: {node.token[1]})"
+            # Nod cu regula intermediara: copiii apar pe acelasi nivel
+            elif node.name.startswith("int_"):
+                if not node.children:
+                    yield ""
+                stack.extend((child, level) for child in reversed(node.children))
             # Nod normal cu o regula principala
             else:
-                s = f"{pad}{self.name}"
+                yield f"{'  ' * level}{node.name}"
+                stack.extend((child, level + 1) for child in reversed(node.children))
+
+    def to_string(self, indent=0):
+        return "\n".join(self.lines(indent))
 
-                for child in self.children:
-                    s += "\n" + child.to_string(indent + 1)
-        return s
+    def write(self, writer: IO[str], indent=0) -> None:
+        # scrie acelasi text ca to_string, linie cu linie, fara sa il construiasca in memorie
+        separator = ""
+        for line in self.lines(indent):
+            writer.write(separator)
+            writer.write(line)
+            separator = "\n"
 
     def __str__(self):
         return self.to_string()
-            
\ No newline at end of file
@@ -1,27 +1,70 @@
-from .Lexer import Lexer
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from .Lexer import Lexer, map_batches
 from .Grammar import Grammar
 
+#parser-ul incarcat in fiecare proces din worker_pool
+_WORKER_PARSER: 'Parser | None' = None
+
+
+def _init_worker(lexer_payload: bytes, grammar: Grammar, method: str, skip: tuple[str, ...]) -> None:
+    global _WORKER_PARSER
+    _WORKER_PARSER = Parser(Lexer.loads(lexer_payload), grammar, method, skip)
+
+
+def _parse_batch(docs: list[str]) -> list[str]:
+    parse = _WORKER_PARSER.parse
+    return [parse(doc) for doc in docs]
+
+
 class Parser():
-    def __init__(self, lexer: Lexer, grammar: Grammar) -> None:
+    # method: 'cyk', 'lalr' sau 'auto' (LALR(1) daca gramatica nu are conflicte, altfel CYK)
+    # implicit ramane 'cyk': 'lalr' si 'auto' construiesc tabelele LALR(1) in constructor
+    # si resping gramaticile cu conflicte pe care CYK nu le poate folosi
+    # skip: tipurile de tokeni pe care lexer-ul nu ii emite deloc
+    METHODS = ('auto', 'cyk', 'lalr')
+
+    def __init__(self, lexer: Lexer, grammar: Grammar, method: str = 'cyk',
+                 skip: Iterable[str] = ("SPACE",)) -> None:
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown parsing method {method!r}, expected one of {self.METHODS}")
         self.lexer = lexer
         self.grammar = grammar
+        self.method = method
+        self.skip = tuple(skip)
+        if method != 'cyk':
+            conflicts = grammar.lalrTable().conflicts
+            if not conflicts:
+                self.method = 'lalr'
+            elif method == 'lalr' or not grammar.cnf:
+                #fara FNC nu avem la ce sa revenim
+                raise ValueError("The grammar is not LALR(1):\n" + "\n".join(conflicts))
+            else:
+                self.method = 'cyk'
+        self._parse_tokens = grammar.lalrParse if self.method == 'lalr' else grammar.cykParse
 
-    
     def parse(self, input_str: str) -> str:
-        #preluam tokenii folosind lexer-ul
-        tokens = self.lexer.lex(input_str)
-        #eliminam tokenii de tip SPACE
-        filtered = []
-        for token in tokens:
-            if token[0] != "SPACE":
-                filtered.append(token)
-        #formam arborele de parsare folosind CYK
-        tree = self.grammar.cykParse(filtered)
+        #preluam tokenii folosind lexer-ul, in forma compacta; tokenii din skip
+        #(implicit SPACE) sunt eliminati direct de lexer
+        tokens = self.lexer.lex(input_str, compact=True, skip=self.skip)
+        #formam arborele de parsare folosind LALR(1) sau CYK
+        tree = self._parse_tokens(tokens)
         #returnam arborele daca exista sau daca nu un mesaj de eroare
         if tree:
             return tree.to_string()
         return "Input string is not valid according to the grammar."
 
+    def worker_pool(self, workers: int | None = None) -> ProcessPoolExecutor:
+        #un pool de procese care au deja parser-ul (tabelul lexer-ului si gramatica) incarcat
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(self.lexer.dumps(), self.grammar, self.method, self.skip))
 
-        
-        
+    def parse_many(self, docs: Iterable[str], executor: Executor | None = None,
+                   chunksize: int = 64, ordered: bool = True) -> Iterator:
+        #ca Lexer.lex_many: serial fara executor, altfel pe loturi intr-un pool din worker_pool
+        if executor is None:
+            for index, doc in enumerate(docs):
+                yield self.parse(doc) if ordered else (index, self.parse(doc))
+            return
+        yield from map_batches(executor, _parse_batch, docs, chunksize, ordered)
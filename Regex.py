@@ -1,14 +1,27 @@
 from typing import Any, List
 from .NFA import NFA
+from .CharSet import CharSet
+from .LRUCache import LRUCache
 
 EPSILON = ''
 
+class StateCounter:
+    # generatorul de stari al unei singure compilari; fiecare compilare are
+    # propriul contor, deci compilarile din fire de executie diferite nu se amesteca
+    def __init__(self) -> None:
+        self.value = 0
+
+    def next(self) -> int:
+        state = self.value
+        self.value += 1
+        return state
+
+
 class Regex:
     # clasa de baza pentru expresii regulate
-    COUNTER = 0
 
-    def thompson(self) -> NFA[int]:
-        # metoda thompson, implementata de subclase
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        # metoda thompson, implementata de subclase; fara contor, starile pornesc de la 0
         raise NotImplementedError("Subclasses should implement this method.")
 
     def add_transition(self, transitions: dict[tuple[int, str], set[int]],
@@ -22,11 +35,10 @@ class Regex:
 
 # sublclasa pentru epsilon
 class Epsilon(Regex):
-    def thompson(self) -> NFA[int]:
-        start = Regex.COUNTER
-        Regex.COUNTER += 1
-        end = Regex.COUNTER
-        Regex.COUNTER += 1
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
+        start = counter.next()
+        end = counter.next()
         d = {}
         self.add_transition(d, start, EPSILON, {end})
         # nfa cu o tranzitie epsilon de la start la end
@@ -38,17 +50,31 @@ class Character(Regex):
     def __init__(self, char: str):
         self.char = char
 
-    def thompson(self) -> NFA[int]:
-        start = Regex.COUNTER
-        Regex.COUNTER += 1
-        end = Regex.COUNTER
-        Regex.COUNTER += 1
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
+        start = counter.next()
+        end = counter.next()
         d = {}
         self.add_transition(d, start, self.char, {end})
         # nfa cu o tranzitie pe caracter de la start la end
         return NFA({self.char}, {start, end}, start, d, {end})
 
 
+# sublclasa pentru clase de caractere ([a-z], [^0-9], ...)
+class CharClass(Regex):
+    def __init__(self, charset: CharSet):
+        self.charset = charset
+
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
+        start = counter.next()
+        end = counter.next()
+        d = {}
+        # o singura tranzitie etichetata cu toata multimea de caractere
+        self.add_transition(d, start, self.charset, {end})
+        return NFA({self.charset}, {start, end}, start, d, {end})
+
+
 # sublclasa pentru operatorul uniune
 class Union(Regex):
     def __init__(self, left: Regex, right: Regex):
@@ -56,15 +82,14 @@ class Union(Regex):
         self.left = left
 
 
-    def thompson(self) -> NFA[int]:
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
         # construieste nfa pentru uniune
-        right_nfa = self.right.thompson()
-        left_nfa = self.left.thompson()
+        right_nfa = self.right.thompson(counter)
+        left_nfa = self.left.thompson(counter)
 
-        new_start = Regex.COUNTER
-        Regex.COUNTER += 1
-        new_end = Regex.COUNTER
-        Regex.COUNTER += 1
+        new_start = counter.next()
+        new_end = counter.next()
 
         S = left_nfa.S.union(right_nfa.S)
         K = left_nfa.K.union(right_nfa.K).union({new_start, new_end})
@@ -90,10 +115,11 @@ class Concat(Regex):
         self.right = right
         self.left = left
 
-    def thompson(self) -> NFA[int]:
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
         # construieste nfa pentru concatenare
-        nfa1 = self.right.thompson()
-        nfa2 = self.left.thompson()
+        nfa1 = self.right.thompson(counter)
+        nfa2 = self.left.thompson(counter)
         S = nfa1.S.union(nfa2.S)
         K = nfa1.K.union(nfa2.K)
         q0 = nfa1.q0
@@ -113,13 +139,12 @@ class Star(Regex):
     def __init__(self, regex: Regex):
         self.regex = regex
 
-    def thompson(self) -> NFA[int]:
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
         # construieste nfa pentru star
-        nfa = self.regex.thompson()
-        next_start = Regex.COUNTER
-        Regex.COUNTER += 1
-        next_end = Regex.COUNTER
-        Regex.COUNTER += 1
+        nfa = self.regex.thompson(counter)
+        next_start = counter.next()
+        next_end = counter.next()
 
         S = nfa.S
         K = nfa.K.union({next_start, next_end})
@@ -141,9 +166,15 @@ class Plus(Regex):
     def __init__(self, regex: Regex):
         self.regex = regex
 
-    def thompson(self) -> NFA[int]:
-        # plus = regex concatenat cu star(regex)
-        return Concat(self.regex, Star(self.regex)).thompson()
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
+        # plus = nfa-ul regex-ului o singura data, cu tranzitii epsilon de la starile
+        # finale inapoi la start (fara sa construim subexpresia de doua ori)
+        nfa = self.regex.thompson(counter)
+        delta = nfa.d.copy()
+        for f in nfa.F:
+            self.add_transition(delta, f, EPSILON, {nfa.q0})
+        return NFA(nfa.S, nfa.K, nfa.q0, delta, nfa.F)
 
 
 # sublclasa pentru optionalitate
@@ -151,9 +182,59 @@ class Optional(Regex):
     def __init__(self, regex: Regex):
         self.regex = regex
 
-    def thompson(self) -> NFA[int]:
-        # optionalitate = regex uniune cu epsilon
-        return Union(self.regex, Epsilon()).thompson()
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
+        # optionalitate = un nou start, care e si stare finala, legat prin epsilon
+        # de startul regex-ului (o stare in plus, fata de 3 si 2 tranzitii ale uniunii cu epsilon)
+        nfa = self.regex.thompson(counter)
+        new_start = counter.next()
+        delta = nfa.d.copy()
+        self.add_transition(delta, new_start, EPSILON, {nfa.q0})
+        return NFA(nfa.S, nfa.K.union({new_start}), new_start, delta, nfa.F.union({new_start}))
+
+
+# sublclasa pentru concatenarea mai multor expresii, produsa de optimize_regex
+class Sequence(Regex):
+    def __init__(self, parts: list[Regex]):
+        self.parts = parts
+
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
+        # ca Concat, starile finale ale fiecarei parti se leaga de startul urmatoarei
+        nfas = [part.thompson(counter) for part in self.parts]
+        S = set().union(*(nfa.S for nfa in nfas))
+        K = set().union(*(nfa.K for nfa in nfas))
+        d = {}
+        for nfa in nfas:
+            d.update(nfa.d)
+        for nfa1, nfa2 in zip(nfas, nfas[1:]):
+            for f1 in nfa1.F:
+                self.add_transition(d, f1, EPSILON, {nfa2.q0})
+        return NFA(S, K, nfas[0].q0, d, nfas[-1].F)
+
+
+# sublclasa pentru uniunea mai multor expresii, produsa de optimize_regex
+class Choice(Regex):
+    def __init__(self, alternatives: list[Regex]):
+        self.alternatives = alternatives
+
+    def thompson(self, counter: StateCounter | None = None) -> NFA[int]:
+        counter = counter or StateCounter()
+        # un singur start si un singur end noi pentru toate alternativele,
+        # in loc de cate o pereche pentru fiecare Union binar
+        nfas = [alternative.thompson(counter) for alternative in self.alternatives]
+        new_start = counter.next()
+        new_end = counter.next()
+        S = set().union(*(nfa.S for nfa in nfas))
+        K = set().union(*(nfa.K for nfa in nfas)).union({new_start, new_end})
+        delta = {}
+        for nfa in nfas:
+            delta.update(nfa.d)
+        self.add_transition(delta, new_start, EPSILON, {nfa.q0 for nfa in nfas})
+        for nfa in nfas:
+            for final_state in nfa.F:
+                self.add_transition(delta, final_state, EPSILON, {new_end})
+        return NFA(S, K, new_start, delta, {new_end})
 
 
 # funcrii auxiliare pentru parsare
@@ -162,7 +243,7 @@ class AuxFunctions:
     @staticmethod
     def is_character(token: str) -> bool:
         # verifica daca token-ul e un caracter/operand
-        if token not in ('(', ')', '|', '&', '*', '+', '?'):
+        if isinstance(token, CharSet) or token not in ('(', ')', '|', '&', '*', '+', '?'):
             return True  # simbolul pentru epsilon
         return False
 
@@ -176,14 +257,54 @@ class AuxFunctions:
     @staticmethod
     def is_operand_start(token: str) -> bool:
         # verifica daca token-ul e inceputul unui operand
-        if AuxFunctions.is_character(token) or token in ('('):
+        if AuxFunctions.is_character(token) or token == '(':
             return True
         return False
 
 
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+
+
+def parse_char_class(regex_string: str, index: int) -> tuple[CharSet, int] | None:
+    # parseaza o clasa [..] care incepe la index, intoarce multimea si
+    # pozitia de dupa ']' sau None daca paranteza nu e inchisa
+    position = index + 1
+    negated = regex_string.startswith('^', position)
+    if negated:
+        position += 1
+    ranges = []
+    first = True
+    while position < len(regex_string):
+        char = regex_string[position]
+        # ']' imediat dupa '[' sau '[^' e caracter obisnuit
+        if char == ']' and not first:
+            charset = CharSet.from_ranges(ranges)
+            return (charset.negate() if negated else charset), position + 1
+        first = False
+        if char == '\\' and position + 1 < len(regex_string):
+            char = ESCAPES.get(regex_string[position + 1], regex_string[position + 1])
+            position += 2
+        else:
+            position += 1
+        low = ord(char)
+        # interval de forma a-z, '-' la final e caracter obisnuit
+        if (regex_string.startswith('-', position) and position + 1 < len(regex_string)
+                and regex_string[position + 1] != ']'):
+            high_char = regex_string[position + 1]
+            position += 2
+            if high_char == '\\' and position < len(regex_string):
+                high_char = ESCAPES.get(regex_string[position], regex_string[position])
+                position += 1
+            if ord(high_char) < low:
+                raise ValueError(f"Invalid range {char}-{high_char} in {regex_string!r}")
+            ranges.append((low, ord(high_char)))
+        else:
+            ranges.append((low, low))
+    return None
+
+
 def parse_regex(regex_string: str) -> Regex:
     # functie principala de parsare a regex-ului
-    Regex.COUNTER = 0  # reseteaza generatorul de stari
     OPERATORS = {'|': 1, '&': 2, '*': 3, '?': 3, '+': 3}
 
     regex_parts = []
@@ -210,25 +331,10 @@ def parse_regex(regex_string: str) -> Regex:
                 continue
             index += 1
 
-        # syntactic sugar
-        elif regex_string.startswith('[a-z]', index):
-            chars = [chr(j) for j in range(ord('a'), ord('z') + 1)]
-            regex_parts.append('(')
-            regex_parts.extend(list('|'.join(chars)))
-            regex_parts.append(')')
-            index += 5
-        elif regex_string.startswith('[A-Z]', index):
-            chars = [chr(j) for j in range(ord('A'), ord('Z') + 1)]
-            regex_parts.append('(')
-            regex_parts.extend(list('|'.join(chars)))
-            regex_parts.append(')')
-            index += 5
-        elif regex_string.startswith('[0-9]', index):
-            chars = [chr(j) for j in range(ord('0'), ord('9') + 1)]
-            regex_parts.append('(')
-            regex_parts.extend(list('|'.join(chars)))
-            regex_parts.append(')')
-            index += 5
+        # clase de caractere, pastrate ca o singura multime
+        elif char == '[' and (parsed := parse_char_class(regex_string, index)):
+            charset, index = parsed
+            regex_parts.append(charset)
         elif regex_string.startswith('eps', index):
             # simbol pentru epsilon
             regex_parts.append('#')
@@ -242,11 +348,11 @@ def parse_regex(regex_string: str) -> Regex:
     for index, value in enumerate(regex_parts):
         if value == '|':
             # inserare epsilon inainte de '|' daca nu e operand
-            if regex_union[-1] in ('('):
+            if regex_union[-1] == '(':
                 regex_union.append('#')
             regex_union.append('|')
             # inserare epsilon dupa '|' daca nu e operand
-            if index + 1 >= len(regex_parts) or regex_parts[index + 1] in (')'):
+            if index + 1 >= len(regex_parts) or regex_parts[index + 1] == ')':
                 regex_union.append('#')
         else:
             regex_union.append(value)
@@ -293,7 +399,9 @@ def parse_regex(regex_string: str) -> Regex:
     ast: List[Regex] = []
     for value in final_collecion:
         if AuxFunctions.is_character(value):
-            if value == '#':
+            if isinstance(value, CharSet):
+                ast.append(CharClass(value))
+            elif value == '#':
                 ast.append(Epsilon())
             else:
                 # gestionare caractere escapate
@@ -328,4 +436,160 @@ def parse_regex(regex_string: str) -> Regex:
                     ast.append(Plus(r))
 
     # nodul radacina al ast-ului
-    return ast.pop()
\ No newline at end of file
+    return ast.pop()
+
+def regex_key(regex: Regex) -> tuple:
+    # forma structurala a unui AST, folosita pentru a compara subexpresii
+    if isinstance(regex, Character):
+        return ('c', regex.char)
+    if isinstance(regex, CharClass):
+        return ('[', regex.charset)
+    if isinstance(regex, Epsilon):
+        return ('#',)
+    if isinstance(regex, Star):
+        return ('*', regex_key(regex.regex))
+    if isinstance(regex, Plus):
+        return ('+', regex_key(regex.regex))
+    if isinstance(regex, Optional):
+        return ('?', regex_key(regex.regex))
+    if isinstance(regex, Concat):
+        return ('&', regex_key(regex.right), regex_key(regex.left))
+    if isinstance(regex, Union):
+        return ('|', regex_key(regex.left), regex_key(regex.right))
+    if isinstance(regex, Sequence):
+        return ('&',) + tuple(regex_key(part) for part in regex.parts)
+    if isinstance(regex, Choice):
+        return ('|',) + tuple(regex_key(alternative) for alternative in regex.alternatives)
+    raise ValueError(f"Unknown regex node {type(regex).__name__}")
+
+
+def _concat_parts(regex: Regex) -> list[Regex]:
+    # partile unei concatenari, in ordine, fara concatenarile imbricate
+    # (in Concat, right e primul operand)
+    if isinstance(regex, Concat):
+        return _concat_parts(regex.right) + _concat_parts(regex.left)
+    if isinstance(regex, Sequence):
+        return [part for item in regex.parts for part in _concat_parts(item)]
+    return [regex]
+
+
+def _union_alternatives(regex: Regex) -> list[Regex]:
+    # alternativele unei uniuni, fara uniunile imbricate
+    if isinstance(regex, Union):
+        return _union_alternatives(regex.left) + _union_alternatives(regex.right)
+    if isinstance(regex, Choice):
+        return [part for item in regex.alternatives for part in _union_alternatives(item)]
+    return [regex]
+
+
+def _sequence(parts: list[Regex]) -> Regex:
+    parts = [part for part in parts if not isinstance(part, Epsilon)]
+    if not parts:
+        return Epsilon()
+    return parts[0] if len(parts) == 1 else Sequence(parts)
+
+
+def _optional(regex: Regex) -> Regex:
+    # r? simplificat: eps? = eps, (r*)? = r*, (r?)? = r?, (r+)? = r*
+    if isinstance(regex, (Epsilon, Star, Optional)):
+        return regex
+    if isinstance(regex, Plus):
+        return Star(regex.regex)
+    return Optional(regex)
+
+
+def _choice(alternatives: list[Regex]) -> Regex:
+    # uniunea alternativelor deja optimizate: eliminam epsilon (devine r?) si duplicatele,
+    # scoatem prefixele comune in factor si unim alternativele de un caracter intr-o clasa
+    nullable = False
+    # alternativele grupate dupa prima parte a concatenarii, in ordinea primei aparitii
+    groups: dict[tuple, list[list[Regex]]] = {}
+    for alternative in alternatives:
+        if isinstance(alternative, Epsilon):
+            nullable = True
+            continue
+        parts = _concat_parts(alternative)
+        keys = list(map(regex_key, parts))
+        group = groups.setdefault(keys[0], [])
+        if not any(list(map(regex_key, other)) == keys for other in group):
+            group.append(parts)
+    result = []
+    chars = []
+    for group in groups.values():
+        if len(group) == 1:
+            regex = _sequence(group[0])
+        else:
+            # cel mai lung prefix comun al grupului
+            prefix = 1
+            while all(len(parts) > prefix for parts in group) and len(
+                    {regex_key(parts[prefix]) for parts in group}) == 1:
+                prefix += 1
+            tails = _choice([_sequence(parts[prefix:]) for parts in group])
+            regex = _sequence(group[0][:prefix] + [tails])
+        if isinstance(regex, (Character, CharClass)):
+            chars.append(regex)
+        else:
+            result.append(regex)
+    if len(chars) > 1:
+        ranges = []
+        for char in chars:
+            if isinstance(char, Character):
+                ranges.append((ord(char.char), ord(char.char)))
+            else:
+                ranges.extend(char.charset.ranges)
+        chars = [CharClass(CharSet.from_ranges(ranges))]
+    result = chars + result
+    if not result:
+        return Epsilon()
+    regex = result[0] if len(result) == 1 else Choice(result)
+    return _optional(regex) if nullable else regex
+
+
+def optimize_regex(regex: Regex) -> Regex:
+    # rescrie AST-ul intr-unul echivalent care produce un nfa mai mic: concatenarile si
+    # uniunile imbricate devin noduri Sequence / Choice cu mai multi operanzi, alternativele
+    # de un caracter se unesc intr-o clasa, epsilon-urile inutile dispar, iar prefixele
+    # comune ale alternativelor se scot in factor (ab|ac -> a[bc])
+    if isinstance(regex, (Concat, Sequence)):
+        parts = []
+        for part in _concat_parts(regex):
+            parts.extend(_concat_parts(optimize_regex(part)))
+        return _sequence(parts)
+    if isinstance(regex, (Union, Choice)):
+        return _choice([optimize_regex(alternative) for alternative in _union_alternatives(regex)])
+    if isinstance(regex, Star):
+        inner = optimize_regex(regex.regex)
+        # eps* = eps, (r*)* = (r+)* = (r?)* = r*
+        if isinstance(inner, (Epsilon, Star)):
+            return inner
+        if isinstance(inner, (Plus, Optional)):
+            return Star(inner.regex)
+        return Star(inner)
+    if isinstance(regex, Plus):
+        inner = optimize_regex(regex.regex)
+        # eps+ = eps, (r*)+ = r*, (r+)+ = r+, (r?)+ = r*
+        if isinstance(inner, (Epsilon, Star, Plus)):
+            return inner
+        if isinstance(inner, Optional):
+            return Star(inner.regex)
+        return Plus(inner)
+    if isinstance(regex, Optional):
+        return _optional(optimize_regex(regex.regex))
+    return regex
+
+
+# cache-uri in proces pentru AST-uri si NFA-uri thompson, cheia e sirul regex-ului
+AST_CACHE: LRUCache[Regex] = LRUCache(1024)
+NFA_CACHE: LRUCache[NFA[int]] = LRUCache(1024)
+
+
+def parse_regex_cached(regex_string: str) -> Regex:
+    # ca parse_regex, dar AST-ul e refolosit pentru acelasi regex
+    return AST_CACHE.get_or_build(regex_string, lambda: parse_regex(regex_string))
+
+
+def compile_regex(regex_string: str) -> NFA[int]:
+    # NFA-ul thompson al AST-ului optimizat (stari de la 0), refolosit pentru acelasi regex;
+    # rezultatul e comun tuturor apelantilor si nu trebuie modificat
+    return NFA_CACHE.get_or_build(
+        regex_string, lambda: optimize_regex(parse_regex_cached(regex_string)).thompson(StateCounter()))
@@ -0,0 +1,167 @@
+from array import array
+from collections.abc import Iterable, Iterator
+
+from .LineIndex import LineIndex
+
+
+class TokenBuffer:
+    # rezultatul compact al lui lex: coloane paralele de intregi in loc de o lista
+    # de tupluri; lexemele se construiesc doar cand sunt cerute
+    # un token cu tipul -1 reprezinta eroarea, ca ("", mesaj) in rezultatul lui lex
+    # tokenii retin doar offset-uri; linia si coloana se calculeaza la cerere dintr-un LineIndex
+    def __init__(self, source: str, names: list[str]):
+        self.source = source
+        self.names = names
+        self.types = array('i')
+        # offset-urile pot depasi 2^31 pe fisiere mari
+        self.starts = array('q')
+        self.ends = array('q')
+        # cat de departe a citit scanarea (maximul pana la token-ul curent inclusiv):
+        # token-ul i depinde doar de source[:reaches[i] + 1], folosit la re-lexarea incrementala;
+        # lex nu il completeaza, e calculat de Lexer.relex la prima editare
+        self.reaches: array | None = None
+        self.error: str | None = None
+        # tipurile de tokeni ignorate la lexare (parametrul skip al lui lex)
+        self.skip: frozenset[str] = frozenset()
+        self._line_index: LineIndex | None = None
+
+    def append(self, token: int, start: int, end: int) -> None:
+        self.types.append(token)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def set_error(self, message: str) -> None:
+        # ca in lex, la eroare rezultatul contine doar eroarea
+        self.types = array('i', [-1])
+        self.starts = array('q', [0])
+        self.ends = array('q', [0])
+        self.reaches = None
+        self.error = message
+
+    def token_type(self, i: int) -> str:
+        token = self.types[i]
+        return self.names[token] if token >= 0 else ""
+
+    def lexeme(self, i: int) -> str:
+        if self.types[i] < 0:
+            return self.error
+        return self.source[self.starts[i]:self.ends[i]]
+
+    @property
+    def line_index(self) -> LineIndex:
+        # construit la prima cerere a unei pozitii
+        if self._line_index is None:
+            self._line_index = LineIndex(self.source)
+        return self._line_index
+
+    @property
+    def lines(self) -> array:
+        # linia fiecarui token
+        line = self.line_index.line
+        return array('i', map(line, self.starts))
+
+    def line(self, i: int) -> int:
+        return self.line_index.line(self.starts[i])
+
+    def column(self, i: int) -> int:
+        return self.line_index.column(self.starts[i])
+
+    def position(self, i: int) -> tuple[int, int]:
+        return self.line_index.position(self.starts[i])
+
+    def type_names(self) -> Iterator[str]:
+        # tipurile tokenilor, fara sa construim lexemele
+        names = self.names
+        for token in self.types:
+            yield names[token] if token >= 0 else ""
+
+    def without(self, excluded: Iterable[str]) -> 'TokenBuffer':
+        # o copie fara tokenii de tipurile date (de exemplu SPACE)
+        skip = {i for i, name in enumerate(self.names) if name in excluded}
+        result = TokenBuffer(self.source, self.names)
+        result.error = self.error
+        result.skip = self.skip | frozenset(excluded)
+        result._line_index = self._line_index
+        reaches = self.reaches
+        if reaches is not None:
+            result.reaches = array('q')
+        for i, token in enumerate(self.types):
+            if token not in skip:
+                result.append(token, self.starts[i], self.ends[i])
+                if reaches is not None:
+                    result.reaches.append(reaches[i])
+        return result
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, i: int) -> tuple[str, str]:
+        if isinstance(i, slice):
+            result = TokenBuffer(self.source, self.names)
+            result.error = self.error
+            result.skip = self.skip
+            result._line_index = self._line_index
+            result.types = self.types[i]
+            result.starts = self.starts[i]
+            result.ends = self.ends[i]
+            if self.reaches is not None:
+                result.reaches = self.reaches[i]
+            return result
+        return self.token_type(i), self.lexeme(i)
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        for i in range(len(self.types)):
+            yield self.token_type(i), self.lexeme(i)
+
+    def __repr__(self) -> str:
+        return f"TokenBuffer({len(self)} tokens)"
+
+
+class TokenEdit:
+    # rezultatul lui Lexer.relex: tokenii previous[start:start + removed] sunt inlocuiti cu
+    # tokens (offset-uri in noul text), iar tokenii de dupa ei raman aceiasi, deplasati cu
+    # delta caractere si line_delta linii
+    def __init__(self, text: str, start: int, removed: int, tokens: TokenBuffer, delta: int,
+                 line_delta: int = 0) -> None:
+        self.text = text
+        self.start = start
+        self.removed = removed
+        self.tokens = tokens
+        self.delta = delta
+        self.line_delta = line_delta
+
+    @property
+    def line_index(self) -> LineIndex:
+        # liniile noului text; relex il obtine din cel vechi, deci pozitiile tokenilor
+        # (tokens.position(i)) nu reparcurg textul
+        return self.tokens.line_index
+
+    def apply(self, previous: TokenBuffer) -> TokenBuffer:
+        # noul TokenBuffer complet; coada se copiaza cu offset-urile deplasate (O(n), dar
+        # fara lexare), ca rezultatul sa poata fi folosit la urmatoarea editare
+        tokens = self.tokens
+        if tokens.error is not None:
+            return tokens
+        result = TokenBuffer(self.text, previous.names)
+        result.skip = previous.skip
+        result._line_index = tokens._line_index
+        start, stop = self.start, self.start + self.removed
+        result.types = previous.types[:start] + tokens.types + previous.types[stop:]
+        shift = self.delta.__add__
+        result.starts = previous.starts[:start] + tokens.starts + array('q', map(shift, previous.starts[stop:]))
+        result.ends = previous.ends[:start] + tokens.ends + array('q', map(shift, previous.ends[stop:]))
+        if previous.reaches is None or tokens.reaches is None:
+            # va fi recalculat la urmatoarea re-lexare
+            return result
+        # reaches trebuie sa ramana crescator: noii tokeni pot citi dincolo de inceputul cozii
+        if len(tokens):
+            reach = tokens.reaches[-1]
+        else:
+            reach = previous.reaches[start - 1] if start > 0 else 0
+        tail = array('q', (max(reach, r) for r in map(shift, previous.reaches[stop:])))
+        result.reaches = previous.reaches[:start] + tokens.reaches + tail
+        return result
+
+    def __repr__(self) -> str:
+        return (f"TokenEdit(start={self.start}, removed={self.removed}, inserted={len(self.tokens)}, "
+                f"line_delta={self.line_delta})")
@@ -0,0 +1,169 @@
+# benchmark-uri pentru constructia lexer-ului, lexare si parsare, cu rezultatele in JSON
+#   python -m <pachet>.benchmarks [--quick] [--output rezultate.json]
+#   python -m <pachet>.benchmarks --compare baseline.json [--threshold 0.25] [--input rezultate.json]
+# unde <pachet> e numele sub care e importat pachetul
+# in modul compare, programul iese cu codul 1 daca vreun rezultat e mai slab decat
+# cel din baseline cu mai mult decat pragul dat (0.25 = 25%)
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable
+
+from .. import __version__
+from ..Grammar import Grammar
+from ..Lexer import Lexer, combine_rule_nfas, remap_func_factory
+from ..NumpyCYK import np
+from ..Regex import StateCounter, optimize_regex, parse_regex
+from .generators import cnf_grammar, lex_input, sentence, token_spec
+
+# dimensiunile folosite: normal si --quick
+PROFILES = {
+    'full': {'rules': 50, 'repeat': 5, 'lex_size': 1 << 20, 'nonterminals': 20, 'cyk_lengths': [25, 50, 100]},
+    'quick': {'rules': 20, 'repeat': 3, 'lex_size': 1 << 16, 'nonterminals': 10, 'cyk_lengths': [10, 20, 40]},
+}
+
+
+def best_time(function: Callable[[], object], repeat: int) -> float:
+    # cel mai bun timp din repeat rulari, cel mai putin afectat de zgomot
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def metric(value: float, unit: str, better: str = 'lower') -> dict:
+    return {'value': value, 'unit': unit, 'better': better}
+
+
+def bench_compile(rules: int, repeat: int) -> dict[str, dict]:
+    # fazele din Lexer.__init__, fara cache-uri: regex -> AST -> NFA, subset construction, minimize
+    spec = token_spec(rules)
+    results = {}
+
+    def thompson_all():
+        return [(optimize_regex(parse_regex(regex)).thompson(StateCounter()).remap_states(remap_func_factory(i)), i, name)
+                for i, (name, regex) in enumerate(spec)]
+
+    results[f'compile.parse_regex_thompson[rules={rules}]'] = metric(best_time(thompson_all, repeat), 's')
+    nfa, finals = combine_rule_nfas(thompson_all())
+    results[f'compile.subset_construction[rules={rules}]'] = metric(
+        best_time(nfa.subset_construction, repeat), 's')
+    dfa = nfa.subset_construction()
+
+    #ca in Lexer: starile care accepta tokeni diferiti pornesc in blocuri diferite
+    def accepted(state):
+        return min((finals[s][0] for s in state if s in finals), default=-1)
+
+    results[f'compile.minimize[rules={rules}]'] = metric(best_time(lambda: dfa.minimize(key=accepted), repeat), 's')
+
+    def build():
+        Lexer.clear_caches()
+        return Lexer(spec)
+
+    results[f'compile.lexer_init[rules={rules}]'] = metric(best_time(build, repeat), 's')
+    return results
+
+
+def bench_lex(rules: int, size: int, repeat: int) -> dict[str, dict]:
+    # debitul lui lex pe un text sintetic, in MB/s si tokeni/s, pentru ambele forme ale rezultatului
+    spec = token_spec(rules)
+    lexer = Lexer(spec)
+    text = lex_input(spec, size)
+    megabytes = len(text.encode('utf-8')) / 1e6
+    results = {}
+    for mode, compact in (('tuples', False), ('compact', True)):
+        tokens = len(lexer.lex(text, compact))
+        seconds = best_time(lambda: lexer.lex(text, compact), repeat)
+        results[f'lex.{mode}.throughput[size={size}]'] = metric(megabytes / seconds, 'MB/s', 'higher')
+        results[f'lex.{mode}.tokens[size={size}]'] = metric(tokens / seconds, 'tokens/s', 'higher')
+    return results
+
+
+def bench_cyk(nonterminals: int, lengths: list[int], repeat: int) -> dict[str, dict]:
+    # timpul lui cykParse pe cuvinte acceptate de lungimi crescatoare
+    V, R, S = cnf_grammar(nonterminals)
+    grammar = Grammar(V, R, S)
+    backends = ['python'] + (['numpy'] if np is not None else [])
+    results = {}
+    for length in lengths:
+        tokens = sentence(R, S, length)
+        for backend in backends:
+            seconds = best_time(lambda: grammar.cykParse(tokens, backend=backend), repeat)
+            results[f'cyk.{backend}[nonterminals={nonterminals},tokens={length}]'] = metric(seconds, 's')
+    return results
+
+
+def run(profile: str) -> dict:
+    sizes = PROFILES[profile]
+    results = {}
+    results.update(bench_compile(sizes['rules'], sizes['repeat']))
+    results.update(bench_lex(sizes['rules'], sizes['lex_size'], sizes['repeat']))
+    results.update(bench_cyk(sizes['nonterminals'], sizes['cyk_lengths'], sizes['repeat']))
+    return {
+        'meta': {'version': __version__, 'profile': profile, 'python': platform.python_version(),
+                 'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    # afiseaza variatia fiecarui rezultat comun si intoarce numele celor care au regresat
+    regressions = []
+    print(f"{'benchmark':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        before, after = old['value'], result['value']
+        #raportul > 1 inseamna mai rau, indiferent de sensul metricii
+        ratio = after / before if result['better'] == 'lower' else before / after
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<60} {before:>12.4g} {after:>12.4g} {ratio - 1:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    #modulul ruleaza ca <pachet>.benchmarks.__main__; in usage apare numele pachetului benchmarks
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__spec__.name.removesuffix('.__main__')}",
+        description='Benchmark lexer construction, lexing and CYK parsing; print or save the '
+                    'results as JSON, or compare them against a saved baseline.')
+    parser.add_argument('--quick', action='store_true', help='smaller sizes, for a fast check')
+    parser.add_argument('--output', help='write the results to this JSON file (default: stdout)')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare against a saved JSON result')
+    parser.add_argument('--input', help='with --compare: use these saved results instead of running')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown before failing, as a fraction (default 0.25)')
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input) as f:
+            current = json.load(f)
+    else:
+        current = run('quick' if args.quick else 'full')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+        return 0
+    if not args.output:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# compara backend-urile CYK (python si numpy) pe expresii aritmetice de lungimi crescatoare:
+# verifica ca arborii sunt identici si afiseaza timpii
+#   python -m <pachet>.benchmarks.cyk_backends [lungime ...]
+import random
+import sys
+import time
+
+from ..Grammar import Grammar
+
+# gramatica expresiilor in FNC: E -> E + T | T, T -> T * F | F, F -> ( E ) | NUM | ID
+EXPRESSION_RULES = {
+    ("E", "E", "int_1"), ("E", "T", "int_2"), ("E", "Lp", "int_3"), ("E", "NUM", None), ("E", "ID", None),
+    ("int_1", "Plus", "T"),
+    ("T", "T", "int_2"), ("T", "Lp", "int_3"), ("T", "NUM", None), ("T", "ID", None),
+    ("int_2", "Star", "F"),
+    ("F", "Lp", "int_3"), ("F", "NUM", None), ("F", "ID", None),
+    ("int_3", "E", "Rp"),
+    ("Plus", "PLUS", None), ("Star", "STAR", None), ("Lp", "LPAREN", None), ("Rp", "RPAREN", None),
+}
+
+
+def expression_tokens(length: int, seed: int = 0) -> list[tuple[str, str]]:
+    # o expresie valida cu aproximativ length tokeni
+    rng = random.Random(seed)
+    tokens = [("NUM", "1")]
+    while len(tokens) < length:
+        choice = rng.random()
+        if choice < 0.4:
+            tokens += [("PLUS", "+"), ("ID", "x")]
+        elif choice < 0.8:
+            tokens += [("STAR", "*"), ("NUM", "2")]
+        else:
+            tokens = [("LPAREN", "(")] + tokens + [("RPAREN", ")")]
+    return tokens
+
+
+def main(lengths: list[int]) -> None:
+    symbols = {symbol for rule in EXPRESSION_RULES for symbol in rule if symbol}
+    grammar = Grammar(symbols, EXPRESSION_RULES, "E")
+    print(f"{'tokens':>8} {'python (s)':>12} {'numpy (s)':>12} {'speedup':>8}")
+    for length in lengths:
+        tokens = expression_tokens(length)
+        start = time.perf_counter()
+        expected = grammar.cykParse(tokens)
+        python_time = time.perf_counter() - start
+        start = time.perf_counter()
+        result = grammar.cykParse(tokens, backend='numpy')
+        numpy_time = time.perf_counter() - start
+        if expected is None or result is None or expected.to_string() != result.to_string():
+            raise AssertionError(f"The backends disagree on {len(tokens)} tokens")
+        print(f"{len(tokens):>8} {python_time:>12.4f} {numpy_time:>12.4f} {python_time / numpy_time:>8.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50, 100, 200, 400])
@@ -0,0 +1,96 @@
+# generatoare deterministe (dupa seed) de date sintetice pentru benchmark-uri
+import random
+
+# ponderile implicite ale tipurilor de tokeni din intrarile generate
+DEFAULT_MIX = {'keyword': 0.3, 'identifier': 0.4, 'number': 0.3}
+
+
+def token_spec(rules: int, seed: int = 0) -> list[tuple[str, str]]:
+    # o specificatie cu rules >= 3 reguli: cuvinte cheie, apoi ID, NUM si SPACE
+    # (cuvintele cheie sunt primele, deci au prioritate fata de ID)
+    rng = random.Random(seed)
+    keywords: set[str] = set()
+    while len(keywords) < max(rules - 3, 0):
+        keywords.add(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 8))))
+    spec = [(f"KW_{i}", word) for i, word in enumerate(sorted(keywords))]
+    spec += [
+        ("ID", "[a-z_][a-z0-9_]*"),
+        ("NUM", "[0-9]+(.[0-9]+)?"),
+        ("SPACE", "(\\ |\n|\t)+"),
+    ]
+    return spec
+
+
+def lex_input(spec: list[tuple[str, str]], size: int, mix: dict[str, float] | None = None,
+              space: float = 1.0, seed: int = 0) -> str:
+    # un text de aproximativ size caractere pentru o specificatie data de token_spec;
+    # mix da ponderile tipurilor de tokeni (keyword, identifier, number), iar space e
+    # lungimea medie a spatiilor dintre tokeni (minim un caracter)
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    keywords = [regex for name, regex in spec if name.startswith("KW_")] or ["kw"]
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    parts = []
+    total = 0
+    while total < size:
+        kind = rng.choices(kinds, weights)[0]
+        if kind == 'keyword':
+            word = rng.choice(keywords)
+        elif kind == 'identifier':
+            word = 'v_' + ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789')
+                                  for _ in range(rng.randint(1, 10)))
+        else:
+            word = str(rng.randint(0, 10 ** rng.randint(1, 8)))
+            if rng.random() < 0.2:
+                word += '.' + str(rng.randint(0, 999))
+        gap = ' ' * max(1, round(rng.expovariate(1 / space))) if space > 0 else ' '
+        if rng.random() < 0.1:
+            gap = '\n' + gap[1:]
+        parts.append(word)
+        parts.append(gap)
+        total += len(word) + len(gap)
+    return ''.join(parts)[:size]
+
+
+def cnf_grammar(nonterminals: int, terminals: int = 8, binary_rules: int = 3,
+                seed: int = 0) -> tuple[set[str], set[tuple[str, str, str | None]], str]:
+    # (V, R, S) pentru Grammar: o gramatica in FNC in care fiecare neterminal are o
+    # regula X -> terminal si binary_rules reguli X -> Y Z, deci genereaza cuvinte de orice lungime
+    rng = random.Random(seed)
+    names = [f"N{i}" for i in range(nonterminals)]
+    tokens = [f"T{i}" for i in range(terminals)]
+    rules: set[tuple[str, str, str | None]] = set()
+    for name in names:
+        rules.add((name, rng.choice(tokens), None))
+        for _ in range(binary_rules):
+            rules.add((name, rng.choice(names), rng.choice(names)))
+    return set(names) | set(tokens), rules, names[0]
+
+
+def sentence(rules: set[tuple[str, str, str | None]], start: str, length: int,
+             seed: int = 0) -> list[tuple[str, str]]:
+    # un cuvant de exact length tokeni generat de gramatica (dintr-o derivare aleatoare);
+    # fiecare neterminal trebuie sa aiba reguli unitare si binare, ca in cnf_grammar
+    rng = random.Random(seed)
+    unit: dict[str, list[str]] = {}
+    binary: dict[str, list[tuple[str, str]]] = {}
+    for x, y, z in sorted(rules, key=str):
+        if z is None:
+            unit.setdefault(x, []).append(y)
+        else:
+            binary.setdefault(x, []).append((y, z))
+    tokens = []
+    #derivare cea mai din stanga, cu o stiva explicita de (neterminal, lungime)
+    stack = [(start, length)]
+    while stack:
+        symbol, size = stack.pop()
+        if size == 1:
+            token = rng.choice(unit[symbol])
+            tokens.append((token, token.lower()))
+            continue
+        left, right = rng.choice(binary[symbol])
+        split = rng.randint(1, size - 1)
+        stack.append((right, size - split))
+        stack.append((left, split))
+    return tokens
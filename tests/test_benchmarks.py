@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ..benchmarks.__main__ import compare, main, metric
+from ..benchmarks.generators import cnf_grammar, lex_input, sentence, token_spec
+from ..Grammar import Grammar
+from ..Lexer import Lexer
+
+
+def test_generators():
+    spec = token_spec(10, seed=1)
+    assert spec == token_spec(10, seed=1)
+    assert len(spec) == 10
+    text = lex_input(spec, 500, seed=2)
+    assert len(text) == 500
+    assert Lexer(spec).lex(text)[0][0] != ''
+    V, R, S = cnf_grammar(5, seed=3)
+    tokens = sentence(R, S, 12, seed=4)
+    assert len(tokens) == 12
+    assert Grammar(V, R, S).cykParse(tokens) is not None
+
+
+def test_compare_flags_regressions():
+    baseline = {'results': {'time': metric(1.0, 's'), 'speed': metric(100.0, 'MB/s', 'higher')}}
+    current = {'results': {'time': metric(1.3, 's'), 'speed': metric(90.0, 'MB/s', 'higher'),
+                           'new': metric(5.0, 's')}}
+    assert compare(baseline, current, 0.25) == ['time']
+    assert compare(baseline, current, 0.05) == ['time', 'speed']
+
+
+def test_usage_names_the_package(capsys):
+    #numele sub care e importat pachetul, nu un nume fixat
+    module = __package__.rpartition('.')[0] + '.benchmarks'
+    with pytest.raises(SystemExit):
+        main(['--help'])
+    assert capsys.readouterr().out.startswith(f"usage: python -m {module} ")
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run([sys.executable, '-m', module, '--help'], cwd=root,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.startswith(f"usage: python -m {module} ")
@@ -0,0 +1,32 @@
+from itertools import product
+
+from ..Regex import parse_regex
+
+
+def words(alphabet, max_length):
+    for length in range(max_length + 1):
+        for letters in product(alphabet, repeat=length):
+            yield ''.join(letters)
+
+
+def test_subset_construction():
+    nfa = parse_regex('(a|b)*abb').thompson()
+    dfa = nfa.subset_construction()
+    assert dfa.q0 == frozenset(nfa.epsilon_closure(nfa.q0))
+    for word in words('ab', 6):
+        assert dfa.accept(word) == word.endswith('abb')
+
+
+def test_minimize():
+    dfa = parse_regex('(a|b)*abb').thompson().subset_construction()
+    small = dfa.minimize()
+    #cele 4 stari ale automatului minimal, plus sink state-ul
+    assert len(small.K) < len(dfa.K)
+    for word in words('ab', 6):
+        assert small.accept(word) == dfa.accept(word)
+
+
+def test_minimize_key():
+    dfa = parse_regex('a|b').thompson().subset_construction()
+    #fara cheie starile finale se unesc, cu cheie raman separate
+    assert len(dfa.minimize().K) < len(dfa.minimize(key=lambda q: q).K)
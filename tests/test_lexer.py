@@ -0,0 +1,390 @@
+import io
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ..Lexer import Lexer
+from ..LineIndex import LineIndex
+
+SPEC = [('A', 'a'), ('SP', '\\ '), ('ID', '[a-z]+')]
+LINES_SPEC = [('A', 'a'), ('AB', 'a*b'), ('SPACE', '\\ |\n')]
+
+KW_SPEC = [('KW', 'if|else|while'), ('ID', '[a-z][a-z0-9]*'), ('NUM', '[0-9]+'),
+           ('STR', '"[^"]*"'), ('SPACE', '(\\ |\n)+')]
+TEXT = 'while x1 if 12\nelse "a b\n c" iffy 7\n' * 20
+
+
+def test_lex_longest_match_and_priority():
+    lexer = Lexer(SPEC)
+    assert lexer.lex('a ab aa') == [('A', 'a'), ('SP', ' '), ('ID', 'ab'), ('SP', ' '), ('ID', 'aa')]
+    assert lexer.lex('') == []
+
+
+def test_lex_errors():
+    lexer = Lexer(LINES_SPEC)
+    assert lexer.lex('aab\nab a') == [('AB', 'aab'), ('SPACE', '\n'), ('AB', 'ab'), ('SPACE', ' '), ('A', 'a')]
+    assert lexer.lex('ab\n c') == [('', 'No viable alternative at character 1, line 1')]
+    assert Lexer([('AB', 'ab')]).lex('aba') == [('', 'No viable alternative at character EOF, line 0')]
+
+
+def test_char_classes():
+    lexer = Lexer([('HEX', '[0-9a-fA-F]+'), ('WORD', '[^0-9a-fA-F ]+'), ('SP', '\\ ')])
+    assert lexer.lex('Beef zz9 ș') == [('HEX', 'Beef'), ('SP', ' '), ('WORD', 'zz'), ('HEX', '9'),
+                                           ('SP', ' '), ('WORD', 'ș')]
+
+
+def test_minimize_keeps_tokens_apart():
+    spec = [('A', 'a'), ('B', 'b'), ('AB', '(a|b)(a|b)+'), ('SP', '\\ ')]
+    text = 'a b ab ba bab'
+    assert Lexer(spec, minimize=True).lex(text) == Lexer(spec).lex(text)
+
+
+def test_lazy_matches_eager():
+    eager = Lexer(KW_SPEC)
+    for cache_size in (2, 12, 4096):
+        lexer = Lexer(KW_SPEC, lazy=True, cache_size=cache_size)
+        for text in (TEXT[:38], TEXT, TEXT[:38]):
+            assert lexer.lex(text) == eager.lex(text)
+    with pytest.raises(ValueError):
+        Lexer(KW_SPEC, lazy=True, minimize=True)
+
+
+def test_lazy_cache_flush():
+    eager = Lexer(KW_SPEC)
+    lexer = Lexer(KW_SPEC, lazy=True, cache_size=12)
+    #cache-ul se goleste, dar nu de destule ori ca sa treaca pe simularea nfa
+    assert lexer.lex(TEXT[:38]) == eager.lex(TEXT[:38])
+    assert lexer._flushes == 2 and not lexer._fallback
+    #dupa MAX_CACHE_FLUSHES goliri restul apelului se face prin simularea nfa
+    assert lexer.lex(TEXT) == eager.lex(TEXT)
+    assert lexer._fallback
+
+
+def test_lex_stream_chunks():
+    lexer = Lexer(KW_SPEC)
+    for chunk_size in (1, 3, 64):
+        assert list(lexer.lex_stream(io.StringIO(TEXT), chunk_size=chunk_size)) == lexer.lex(TEXT)
+    assert list(lexer.lex_stream(['wh', 'ile x', '1'])) == lexer.lex('while x1')
+
+
+def test_lex_stream_error():
+    tokens = list(Lexer(LINES_SPEC).lex_stream(io.StringIO('ab\nb c'), chunk_size=2))
+    assert tokens == [('AB', 'ab'), ('SPACE', '\n'), ('AB', 'b'), ('SPACE', ' '),
+                      ('', 'No viable alternative at character 2, line 1')]
+
+
+def test_lex_bytes_utf8(tmp_path):
+    lexer = Lexer([('U', 'ăș+'), ('SP', '\\ '), ('ID', '[a-z]+')])
+    data = 'ăș ab ășș'.encode()
+    expected = [(0, 0, 4), (1, 4, 5), (2, 5, 7), (1, 7, 8), (0, 8, 14)]
+    assert lexer.lex_bytes(data) == expected
+    assert lexer.lex_bytes(memoryview(bytearray(data))) == expected
+    path = tmp_path / 'input.txt'
+    path.write_bytes(data)
+    assert lexer.lex_file(str(path)) == expected
+    assert lexer.lex_bytes(b'ab \xff')[-1][0] == -1
+
+
+def test_compact_buffer():
+    lexer = Lexer(LINES_SPEC)
+    tokens = lexer.lex('aab\nab a', compact=True)
+    assert list(tokens) == lexer.lex('aab\nab a')
+    assert len(tokens) == 5
+    assert tokens[2] == ('AB', 'ab')
+    assert list(tokens[1:3]) == [('SPACE', '\n'), ('AB', 'ab')]
+    assert [tokens.line(i) for i in range(len(tokens))] == [0, 0, 1, 1, 1]
+    assert list(tokens.without(['SPACE'])) == [('AB', 'aab'), ('AB', 'ab'), ('A', 'a')]
+    assert list(lexer.lex('ab\n c', compact=True)) == lexer.lex('ab\n c')
+
+
+def test_dumps_loads(tmp_path):
+    lexer = Lexer(KW_SPEC, minimize=True)
+    assert Lexer.loads(lexer.dumps()).lex(TEXT) == lexer.lex(TEXT)
+    path = tmp_path / 'lexer.bin'
+    lexer.save(str(path))
+    assert Lexer.load(str(path)).lex(TEXT) == lexer.lex(TEXT)
+    with pytest.raises(ValueError):
+        Lexer(KW_SPEC, lazy=True).dumps()
+
+
+def test_cached_writes_file(tmp_path):
+    lexer = Lexer.cached(KW_SPEC, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+    assert Lexer.cached(KW_SPEC, cache_dir=str(tmp_path)).lex(TEXT) == lexer.lex(TEXT)
+
+
+def test_build_with_executor():
+    expected = Lexer(KW_SPEC).lex(TEXT)
+    with ThreadPoolExecutor(4) as pool:
+        assert Lexer(KW_SPEC, executor=pool).lex(TEXT) == expected
+        #fiecare constructie are propria numerotare a starilor, deci merge si din mai multe fire
+        results = pool.map(lambda _: Lexer(KW_SPEC).lex(TEXT), range(8))
+        assert all(result == expected for result in results)
+
+
+def test_cached_in_memory():
+    Lexer.clear_caches()
+    lexer = Lexer.cached(SPEC, persistent=False)
+    assert Lexer.cached(SPEC, persistent=False) is lexer
+    assert Lexer.cache_info()['lexer']['hits'] == 1
+    Lexer.clear_caches()
+    assert Lexer.cached(SPEC, persistent=False) is not lexer
+
+
+def test_cached_key_includes_directory(tmp_path, monkeypatch):
+    Lexer.clear_caches()
+    first, second = tmp_path / 'a', tmp_path / 'b'
+    lexer = Lexer.cached(SPEC, persistent=False)
+    #acelasi spec, dar cu cache pe disc: trebuie scris fisierul, nu refolosit lexerul din memorie
+    assert Lexer.cached(SPEC, cache_dir=str(first)) is not lexer
+    assert len(list(first.iterdir())) == 1
+    Lexer.cached(SPEC, cache_dir=str(second))
+    assert len(list(second.iterdir())) == 1
+    #directorul implicit e rezolvat la apel, din mediu
+    monkeypatch.setenv('LEXER_CACHE_DIR', str(second))
+    monkeypatch.chdir(tmp_path)
+    assert Lexer.cached(SPEC) is Lexer.cached(SPEC, cache_dir='b')
+    assert Lexer.cache_info()['lexer']['misses'] == 3
+
+
+def test_lex_parallel_resync():
+    lexer = Lexer(KW_SPEC)
+    with lexer.worker_pool(2) as pool:
+        for compact in (False, True):
+            #bucatile mici taie si sirurile de mai multe linii, deci resincronizarea e necesara
+            for chunk_size in (7, 64):
+                result = lexer.lex_parallel(TEXT, chunk_size=chunk_size, executor=pool, compact=compact)
+                assert list(result) == lexer.lex(TEXT)
+            result = lexer.lex_parallel(TEXT + '#' + TEXT, chunk_size=16, executor=pool, compact=compact)
+            assert list(result) == lexer.lex(TEXT + '#' + TEXT)
+
+
+def test_lex_many():
+    lexer = Lexer(KW_SPEC)
+    docs = [TEXT[:n] for n in range(0, 200, 7)] + ['if #']
+    expected = [lexer.lex(doc) for doc in docs]
+    assert list(lexer.lex_many(docs)) == expected
+    with lexer.worker_pool(2) as pool:
+        assert list(lexer.lex_many(iter(docs), executor=pool, chunksize=3)) == expected
+        unordered = lexer.lex_many(docs, executor=pool, chunksize=3, ordered=False)
+        assert sorted(unordered) == list(enumerate(expected))
+
+
+def test_relex_matches_full_lex():
+    lexer = Lexer(KW_SPEC)
+    for skip in ((), ('SPACE',)):
+        rng = random.Random(0)
+        text = TEXT
+        tokens = lexer.lex(text, compact=True, skip=skip)
+        for _ in range(300):
+            offset = rng.randint(0, len(text))
+            deleted = rng.randint(0, min(4, len(text) - offset))
+            inserted = rng.choice(['', 'x', ' ', '\n', '"', 'if 12', 'whi', '#'])
+            edit = lexer.relex(tokens, offset, deleted, inserted)
+            text = text[:offset] + inserted + text[offset + deleted:]
+            tokens = edit.apply(tokens)
+            assert list(tokens) == lexer.lex(text, skip=skip)
+            assert tokens.line_index.starts == LineIndex(text).starts
+
+
+def test_relex_computes_reaches_lazily():
+    lexer = Lexer(KW_SPEC)
+    tokens = lexer.lex(TEXT, compact=True)
+    assert tokens.reaches is None
+    edit = lexer.relex(tokens, 6, 2, 'y')
+    assert len(tokens.reaches) == len(tokens)
+    assert edit.apply(tokens).reaches is not None
+    #fara reaches la unul din buffere, apply il lasa sa fie recalculat
+    edit = lexer.relex(tokens, 6, 2, 'y')
+    tokens.reaches = None
+    assert edit.apply(tokens).reaches is None
+
+
+def test_relex_positions():
+    lexer = Lexer(KW_SPEC)
+    text = 'if x\nwhile y\nelse z\n'
+    tokens = lexer.lex(text, compact=True, skip=('SPACE',))
+    #'while y' devine 'a\nb', o linie in plus
+    edit = lexer.relex(tokens, 5, 7, 'a\nb')
+    assert edit.line_delta == 1
+    assert [edit.tokens.position(i) for i in range(len(edit.tokens))] == [(1, 0), (2, 0)]
+    assert edit.line_index.starts == LineIndex(edit.text).starts
+    #stergem linia din mijloc
+    edit = lexer.relex(tokens, 5, 8, '')
+    assert edit.line_delta == -1
+    new = edit.apply(tokens)
+    assert [new.position(i) for i in range(len(new))] == [(0, 0), (0, 3), (1, 0), (1, 5)]
+    assert 'line_delta=-1' in repr(edit)
+
+
+def test_linear_lex():
+    spec = [('A', 'a'), ('AB', 'a*b'), ('SP', '\\ ')]
+    for lazy in (False, True):
+        lexer = Lexer(spec, lazy=lazy)
+        for text in ('a' * 500, 'a' * 50 + 'b a' + 'a' * 50, 'a' * 50 + 'c', 'aab ' * 10):
+            assert lexer.lex(text, linear=True) == lexer.lex(text)
+
+
+def test_token_positions():
+    tokens = Lexer(LINES_SPEC).lex('aab\nab a', compact=True)
+    assert [tokens.position(i) for i in range(len(tokens))] == [(0, 0), (0, 3), (1, 0), (1, 2), (1, 3)]
+    assert tokens.column(4) == 3
+    assert list(tokens.lines) == [0, 0, 1, 1, 1]
+    index = LineIndex('a\nbc\n')
+    assert len(index) == 3
+    assert [index.position(offset) for offset in range(6)] == [(0, 0), (0, 1), (1, 0), (1, 1), (1, 2), (2, 0)]
+
+
+def test_skip():
+    lexer = Lexer(KW_SPEC)
+    expected = [token for token in lexer.lex(TEXT) if token[0] != 'SPACE']
+    assert lexer.lex(TEXT, skip=['SPACE']) == expected
+    assert list(lexer.lex(TEXT, compact=True, skip=['SPACE'])) == expected
+    assert list(lexer.lex_stream(io.StringIO(TEXT), chunk_size=5, skip=['SPACE'])) == expected
+    assert list(lexer.lex_many([TEXT], skip=['SPACE'])) == [expected]
+
+
+def test_stats():
+    seen = []
+    lexer = Lexer(SPEC, stats=seen.append)
+    assert lexer.lex('ab a ab') == Lexer(SPEC).lex('ab a ab')
+    stats = lexer.stats()
+    assert seen == [stats]
+    assert [rule.name for rule in stats.rules] == ['A', 'SP', 'ID']
+    assert 'subset_construction' in stats.phases
+    assert (stats.lex_calls, stats.chars, stats.longest_lexeme) == (1, 7, 2)
+    assert stats.tokens == {'ID': 2, 'SP': 2, 'A': 1}
+    assert stats.chars_scanned >= stats.chars
+    lexer.disable_stats()
+    assert lexer.stats() is None
+    lexer.enable_stats()
+    lexer.lex('a', linear=True)
+    assert lexer.stats().tokens == {'A': 1}
+
+
+def lex_counters(stats):
+    counters = stats.as_dict()
+    del counters['phases'], counters['rules']
+    return counters
+
+
+def test_stats_other_entry_points():
+    expected = Lexer(KW_SPEC, stats=True)
+    result = expected.lex(TEXT)
+    seen = []
+    lexer = Lexer(KW_SPEC, stats=seen.append)
+    assert list(lexer.lex_stream(io.StringIO(TEXT), chunk_size=5)) == result
+    assert lex_counters(lexer.stats()) == lex_counters(expected.stats())
+    lexer.stats().reset_lex_counters()
+    #pe ascii octetii si caracterele coincid
+    lexer.lex_bytes(TEXT.encode())
+    assert lex_counters(lexer.stats()) == lex_counters(expected.stats())
+    lexer.stats().reset_lex_counters()
+    tokens = Lexer(KW_SPEC).lex(TEXT, compact=True)
+    lexer.relex(tokens, 6, 2, 'y')
+    #doar tokenul editat si spatiul dinaintea lui (a carui scanare l-a citit) sunt re-lexati
+    assert lexer.stats().tokens == {'SPACE': 1, 'ID': 1}
+    assert (lexer.stats().lex_calls, lexer.stats().chars) == (1, 2)
+    assert len(seen) == 3
+
+
+def test_stats_with_executor():
+    with ThreadPoolExecutor(2) as pool:
+        stats = Lexer(SPEC, stats=True, executor=pool).stats()
+    assert [rule.name for rule in stats.rules] == ['A', 'SP', 'ID']
+    assert 'thompson' in stats.phases
+    lexer = Lexer(KW_SPEC, stats=True)
+    with lexer.worker_pool(1) as pool:
+        #workerii nu au statistici: lexam serial, cu avertisment
+        with pytest.warns(RuntimeWarning):
+            assert lexer.lex_parallel(TEXT, chunk_size=64, executor=pool) == lexer.lex(TEXT)
+        with pytest.warns(RuntimeWarning):
+            assert list(lexer.lex_many([TEXT], executor=pool)) == [lexer.lex(TEXT)]
+    assert lexer.stats().lex_calls == 4
+
+
+def test_skip_generator_lex():
+    lexer = Lexer(SPEC)
+    expected = [('ID', 'ab'), ('A', 'a')]
+    assert lexer.lex('ab a', skip=(s for s in ['SP'])) == expected
+    tokens = lexer.lex('ab a', compact=True, skip=(s for s in ['SP']))
+    assert list(tokens) == expected
+    assert tokens.skip == frozenset({'SP'})
+
+
+def test_skip_generator_stats():
+    lexer = Lexer(SPEC, stats=True)
+    assert list(lexer.lex('ab a', compact=True, skip=(s for s in ['SP']))) == [('ID', 'ab'), ('A', 'a')]
+
+
+def test_skip_generator_lex_many():
+    lexer = Lexer(SPEC)
+    results = list(lexer.lex_many(['a b', 'b a'], skip=iter(['SP'])))
+    assert results == [[('A', 'a'), ('ID', 'b')], [('ID', 'b'), ('A', 'a')]]
+
+
+def test_skip_lex_parallel():
+    lexer = Lexer(SPEC)
+    text = 'ab a abc\n' * 50
+    with lexer.worker_pool(2) as pool:
+        for compact in (False, True):
+            result = lexer.lex_parallel(text, chunk_size=16, executor=pool, compact=compact,
+                                        skip=(s for s in ['SP']))
+            assert list(result) == lexer.lex(text, skip=['SP'])
+
+
+def test_loads_truncated():
+    data = Lexer(SPEC).dumps()
+    for size in range(len(data)):
+        with pytest.raises(ValueError):
+            Lexer.loads(data[:size])
+
+
+def test_loads_checksum():
+    data = bytearray(Lexer(SPEC).dumps())
+    data[-5] ^= 1
+    with pytest.raises(ValueError, match="checksum"):
+        Lexer.loads(bytes(data))
+
+
+def corrupt_dumps(change):
+    #dumps calculeaza crc-ul peste tabelul stricat, deci doar verificarile structurale il prind
+    lexer = Lexer(SPEC)
+    change(lexer)
+    return lexer.dumps()
+
+
+def test_loads_rejects_transition_off_row():
+    def shift(lexer):
+        stride = lexer._ncols + 1
+        k = next(k for k, target in enumerate(lexer._table) if target > 0 and k % stride != lexer._ncols)
+        lexer._table[k] += 1
+    with pytest.raises(ValueError, match="transition"):
+        Lexer.loads(corrupt_dumps(shift))
+
+
+def test_loads_rejects_accepted_token_out_of_range():
+    def accept(lexer):
+        lexer._table[lexer._ncols] = len(lexer.spec)
+    with pytest.raises(ValueError, match="accepted token"):
+        Lexer.loads(corrupt_dumps(accept))
+
+
+def test_loads_rejects_column_count():
+    for ncols in (0, -1):
+        def columns(lexer):
+            lexer._ncols = ncols
+        with pytest.raises(ValueError, match="header"):
+            Lexer.loads(corrupt_dumps(columns))
+
+
+def test_cached_rebuilds_truncated_file(tmp_path):
+    Lexer.clear_caches()
+    Lexer.cached(SPEC, cache_dir=str(tmp_path), persistent=True)
+    (path,) = tmp_path.iterdir()
+    path.write_bytes(path.read_bytes()[:-4])
+    Lexer.clear_caches()
+    lexer = Lexer.cached(SPEC, cache_dir=str(tmp_path))
+    assert lexer.lex('ab a') == [('ID', 'ab'), ('SP', ' '), ('A', 'a')]
+    assert Lexer.loads(path.read_bytes()).lex('a') == [('A', 'a')]
@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ..Lexer import Lexer
+from ..LexerCodegen import generate_lexer_module, main, write_lexer_module
+
+SPEC = [('KW', 'if|else|while'), ('ID', '[a-z][a-z0-9]*'), ('NUM', '[0-9]+'),
+        ('STR', '"[^"]*"'), ('SPACE', '(\\ |\n)+')]
+TEXT = 'while x1 if 12\nelse "a b\n c" iffy 7\n' * 5
+
+
+def load(source):
+    namespace = {}
+    exec(compile(source, 'generated', 'exec'), namespace)
+    return namespace
+
+
+def test_generated_module_matches_lexer():
+    lexer = Lexer(SPEC)
+    module = load(generate_lexer_module(lexer))
+    for text in (TEXT, 'if x1 #', 'if "x'):
+        assert module['lex'](text) == lexer.lex(text)
+    assert module['lex'](TEXT, skip=['SPACE']) == lexer.lex(TEXT, skip=['SPACE'])
+    with pytest.raises(ValueError):
+        generate_lexer_module(Lexer(SPEC, lazy=True))
+
+
+def test_cli(tmp_path):
+    spec = tmp_path / 'spec.json'
+    spec.write_text(json.dumps(SPEC))
+    output = tmp_path / 'out.py'
+    assert main([str(spec), '-o', str(output), '--minimize']) == 0
+    assert load(output.read_text())['lex'](TEXT) == Lexer(SPEC).lex(TEXT)
+
+
+def test_write_is_atomic(tmp_path, monkeypatch):
+    path = tmp_path / 'out.py'
+    path.write_text('old')
+
+    def fail(source, target):
+        raise OSError('disk full')
+
+    #o scriere esuata lasa fisierul vechi si niciun fisier temporar
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        write_lexer_module(Lexer(SPEC), str(path))
+    with pytest.raises(OSError):
+        Lexer(SPEC).save(str(path))
+    assert path.read_text() == 'old'
+    assert list(tmp_path.iterdir()) == [path]
+    monkeypatch.undo()
+    write_lexer_module(Lexer(SPEC), str(path))
+    assert load(path.read_text())['lex'](TEXT) == Lexer(SPEC).lex(TEXT)
+
+
+def test_module_name(capsys):
+    #numele sub care e importat pachetul, nu un nume fixat
+    module = __package__.rpartition('.')[0] + '.LexerCodegen'
+    assert generate_lexer_module(Lexer(SPEC)).startswith(f"# generat de {module} ")
+    with pytest.raises(SystemExit):
+        main(['--help'])
+    assert capsys.readouterr().out.startswith(f"usage: python -m {module} ")
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run([sys.executable, '-m', module, '--help'], cwd=root,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.startswith(f"usage: python -m {module} ")
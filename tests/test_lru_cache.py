@@ -0,0 +1,22 @@
+from ..LRUCache import LRUCache
+
+
+def test_lru_cache_eviction():
+    cache = LRUCache(maxsize=2)
+    built = []
+
+    def build(key):
+        built.append(key)
+        return key.upper()
+
+    assert cache.get_or_build('a', lambda: build('a')) == 'A'
+    cache.get_or_build('b', lambda: build('b'))
+    assert cache.get_or_build('a', lambda: build('a')) == 'A'
+    #'b' e cel mai vechi folosit, deci e scos la adaugarea lui 'c'
+    cache.get_or_build('c', lambda: build('c'))
+    cache.get_or_build('b', lambda: build('b'))
+    assert built == ['a', 'b', 'c', 'b']
+    assert len(cache) == 2
+    assert cache.info()['hits'] == 1
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,132 @@
+import io
+
+import pytest
+
+from ..Grammar import Grammar
+from ..Lexer import Lexer
+from ..Parser import Parser
+from ..ParseTree import ParseTree
+
+
+def grammar_from(tmp_path, text):
+    path = tmp_path / "grammar.txt"
+    path.write_text(text)
+    return Grammar.fromFile(str(path))
+
+
+def test_parse_drops_space(tmp_path):
+    grammar = grammar_from(tmp_path, "S: A B\nA: a\nB: b\n")
+    lexer = Lexer([('a', 'x'), ('b', 'y'), ('SPACE', '\\ ')])
+    parser = Parser(lexer, grammar)
+    assert parser.parse('x  y') == "S\n  (a: x)\n  (b: y)"
+    assert parser.parse('y x') == "Input string is not valid according to the grammar."
+
+
+def test_parse_many(tmp_path):
+    grammar = grammar_from(tmp_path, "S: A B\nA: a\nB: b\n")
+    parser = Parser(Lexer([('a', 'x'), ('b', 'y'), ('SPACE', '\\ ')]), grammar)
+    docs = ['x y', 'y x', 'x  y', 'x']
+    expected = [parser.parse(doc) for doc in docs]
+    assert list(parser.parse_many(docs)) == expected
+    with parser.worker_pool(2) as pool:
+        assert list(parser.parse_many(docs, executor=pool, chunksize=1)) == expected
+
+
+def test_cyk_ambiguous_and_empty(tmp_path):
+    grammar = grammar_from(tmp_path, "S: S S|a\n")
+    assert grammar.cykParse([]) is None
+    tree = grammar.cykParse([('a', 'x')] * 3)
+    #ordinea impartirilor e fixa, deci arborele unei gramatici ambigue e mereu acelasi
+    assert tree.to_string() == "S\n  (a: x)\n  S\n    (a: x)\n    (a: x)"
+    assert grammar.cykParse([('a', 'x'), ('b', 'y')]) is None
+
+
+def test_lalr_general_grammar(tmp_path):
+    grammar = grammar_from(tmp_path, "E: E PLUS T|T\nT: NUM\n")
+    assert not grammar.cnf
+    assert grammar.lalrTable().conflicts == []
+    lexer = Lexer([('NUM', '[0-9]+'), ('PLUS', '\\+'), ('SPACE', '\\ ')])
+    parser = Parser(lexer, grammar, method='auto')
+    assert parser.method == 'lalr'
+    assert parser.parse('1 + 2') == "E\n  E\n    (NUM: 1)\n  (PLUS: +)\n  (NUM: 2)"
+    assert parser.parse('1 +') == "Input string is not valid according to the grammar."
+
+
+def test_lalr_conflicts(tmp_path):
+    grammar = grammar_from(tmp_path, "S: A B|A C\nA: a\nB: b\nC: b\n")
+    assert len(grammar.lalrTable().conflicts) == 1
+    lexer = Lexer([('a', 'x'), ('b', 'y')])
+    assert Parser(lexer, grammar, method='auto').method == 'cyk'
+    with pytest.raises(ValueError):
+        Parser(lexer, grammar, method='lalr')
+
+
+def test_default_method_is_cyk(tmp_path):
+    #o gramatica cu conflicte LALR(1) si fara FNC se construia si inainte; implicit nu
+    #construim tabelele LALR(1), deci nici nu le respingem conflictele
+    grammar = grammar_from(tmp_path, "S: A B|A C|A\nA: a\nB: b\nC: b\n")
+    lexer = Lexer([('a', 'x'), ('b', 'y'), ('SPACE', '\\ ')])
+    parser = Parser(lexer, grammar)
+    assert parser.method == 'cyk'
+    assert parser.parse('x y') == "S\n  (a: x)\n  (b: y)"
+    with pytest.raises(ValueError):
+        Parser(lexer, grammar, method='auto')
+
+
+def test_numpy_backend(tmp_path):
+    pytest.importorskip('numpy')
+    grammar = grammar_from(tmp_path, "S: S S|A B|a\nA: a\nB: b\n")
+    for tokens in ([('a', 'x')] * 5, [('a', 'x'), ('b', 'y'), ('a', 'x')], [('b', 'y')]):
+        python = grammar.cykParse(tokens)
+        numpy = grammar.cykParse(tokens, backend='numpy')
+        assert (python and python.to_string()) == (numpy and numpy.to_string())
+
+
+def test_cyk_chart(tmp_path):
+    grammar = grammar_from(tmp_path, "S: S S|a\n")
+    chart = grammar.cykChart([('a', 'x')] * 3)
+    assert chart.accepts('S')
+    assert chart.tree('S', 1, 2).to_string() == "S\n  (a: x)\n  (a: x)"
+    assert chart.tree('S', 1, 2).to_string() == grammar.cykParse([('a', 'x')] * 2).to_string()
+
+
+def test_parse_tree_rendering():
+    root = node = ParseTree('X')
+    for _ in range(3000):
+        child = ParseTree('X')
+        node.add_children(child)
+        node = child
+    node.add_children(ParseTree('a', ('a', 'x')))
+    text = root.to_string()
+    assert text.count('\n') == 3001
+    writer = io.StringIO()
+    root.write(writer)
+    assert writer.getvalue() == text
+
+
+def test_parser_skip(tmp_path):
+    grammar = grammar_from(tmp_path, "S: A B\nA: a\nB: b\n")
+    lexer = Lexer([('a', 'x'), ('b', 'y'), ('SP', '\\ ')])
+    assert Parser(lexer, grammar, skip=('SP',)).parse('x y') == "S\n  (a: x)\n  (b: y)"
+    tokens = lexer.lex_stream(io.StringIO('x y'), chunk_size=1, skip=['SP'])
+    assert grammar.lalrParse(tokens).to_string() == "S\n  (a: x)\n  (b: y)"
+
+
+def test_unit_nonterminal_production_is_not_cnf(tmp_path):
+    grammar = grammar_from(tmp_path, "S: A B|A\nA: a\nB: b\n")
+    assert not grammar.cnf
+    tokens = [('a', 'x')]
+    assert grammar.lalrParse(tokens).to_string() == "S\n  (a: x)"
+    lexer = Lexer([('a', 'x'), ('b', 'y')])
+    assert Parser(lexer, grammar, method='auto').method == 'lalr'
+
+
+def test_backends_agree_on_cnf_grammar(tmp_path):
+    grammar = grammar_from(tmp_path, "S: A B|a\nA: a\nB: b\n")
+    assert grammar.cnf
+    for tokens in ([('a', 'x'), ('b', 'y')], [('a', 'x')], [('b', 'y')], [('a', 'x'), ('a', 'x')]):
+        lalr = grammar.lalrParse(tokens)
+        cyk = grammar.cykParse(tokens)
+        assert (lalr is None) == (cyk is None), tokens
+        if lalr is not None:
+            assert lalr.to_string() == cyk.to_string()
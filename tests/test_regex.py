@@ -0,0 +1,35 @@
+from itertools import product
+
+from ..Regex import CharClass, compile_regex, optimize_regex, parse_regex, parse_regex_cached, regex_key, Sequence
+
+
+def test_thompson_numbering_is_per_call():
+    regex = parse_regex('(ab|c)*')
+    first = regex.thompson()
+    second = regex.thompson()
+    assert first.K == second.K
+    assert first.d == second.d
+    assert min(first.K) == 0
+
+
+def test_compile_regex_is_cached():
+    assert parse_regex_cached('(ab|c)*') is parse_regex_cached('(ab|c)*')
+    assert compile_regex('(ab|c)*') is compile_regex('(ab|c)*')
+
+
+def test_optimize_regex_shapes():
+    assert isinstance(optimize_regex(parse_regex('a|b|c')), CharClass)
+    assert isinstance(optimize_regex(parse_regex('ab|ac')), Sequence)
+    assert regex_key(optimize_regex(parse_regex('ab|ab'))) == regex_key(optimize_regex(parse_regex('ab')))
+    assert regex_key(optimize_regex(parse_regex('a**'))) == regex_key(optimize_regex(parse_regex('a*')))
+
+
+def test_optimize_regex_keeps_language():
+    for regex in ['(ab|ac)*d', 'a|b|c', '(a|)b', '(a*)*', 'b(a|ab|)+', 'a?b+', '((a|b)c|ad)*']:
+        plain = parse_regex(regex).thompson().subset_construction()
+        optimized = optimize_regex(parse_regex(regex)).thompson().subset_construction()
+        alphabet = sorted(set(regex) - set('()|*+?'))
+        for length in range(5):
+            for letters in product(alphabet, repeat=length):
+                word = ''.join(letters)
+                assert plain.accept(word) == optimized.accept(word), (regex, word)